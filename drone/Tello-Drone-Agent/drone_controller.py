@@ -4,22 +4,49 @@ Drone Control Functions Module
 Contains all drone movement and control functions for the realtime agent.
 """
 
+import asyncio
+import functools
 import logging
-from typing import Dict, Any
+import math
+from typing import Dict, Any, List, Optional
+
+# Shared by all controllers; calls use %-style args so disabled levels skip formatting
+_LOG = logging.getLogger(f"{__name__}.DroneController")
+
+
+def _serialized(method):
+    """Run a controller command under the controller's lock so only one drone command is in flight."""
+    # The Tello rejects a command while another is running, and the state checks
+    # (is_flying etc.) must not interleave with another command's SDK call
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        async with self._command_lock:
+            return await method(self, *args, **kwargs)
+    return wrapper
 
 
 class DroneController:
     """Handles all drone movement and control operations."""
     
-    def __init__(self, drone, drone_state, vision_only: bool = False):
-        self.logger = logging.getLogger(f"{__name__}.DroneController")
+    def __init__(self, drone, drone_state, vision_only: bool = False, drones: Optional[List] = None):
         self.drone = drone
+        # Fleet addressed by the broadcast_* commands, always led by the primary drone
+        self.drones = [drone] + [other for other in (drones or []) if other is not drone]
         self.drone_state = drone_state
         self.vision_only = vision_only
+        # Held for the whole of each command (state check, SDK call, telemetry refresh)
+        self._command_lock = asyncio.Lock()
     
+    def _refresh_telemetry(self):
+        """Read height and battery together from the drone."""
+        # Both values come from the cached Tello state stream, so this needs no extra command round-trip
+        self.drone_state.height = self.drone.get_height()
+        self.drone_state.battery = self.drone.get_battery()
+    
+    @_serialized
     async def takeoff(self, **kwargs) -> str:
         """Take off the drone."""
-        self.logger.info("🚁 Taking off...")
+        _LOG.info("🚁 Taking off...")
         
         if self.drone_state.is_flying:
             return "Drone is already flying!"
@@ -30,20 +57,20 @@ class DroneController:
             return "Takeoff successful - hovering at 80cm"
         
         try:
-            success = self.drone.takeoff()
+            success = await asyncio.to_thread(self.drone.takeoff)
             if success:
                 self.drone_state.is_flying = True
-                self.drone_state.height = self.drone.get_height()
-                self.drone_state.battery = self.drone.get_battery()
+                await asyncio.to_thread(self._refresh_telemetry)
                 return f"Takeoff successful - height: {self.drone_state.height}cm, battery: {self.drone_state.battery}%"
             else:
                 return "Takeoff failed"
         except Exception as e:
             return f"Takeoff error: {str(e)}"
     
+    @_serialized
     async def land(self, **kwargs) -> str:
         """Land the drone."""
-        self.logger.info("🛬 Landing...")
+        _LOG.info("🛬 Landing...")
         
         if not self.drone_state.is_flying:
             return "Drone is already on the ground!"
@@ -54,7 +81,7 @@ class DroneController:
             return "Landing successful"
         
         try:
-            success = self.drone.land()
+            success = await asyncio.to_thread(self.drone.land)
             if success:
                 self.drone_state.is_flying = False
                 self.drone_state.height = 0
@@ -64,9 +91,10 @@ class DroneController:
         except Exception as e:
             return f"Landing error: {str(e)}"
     
+    @_serialized
     async def move_forward(self, distance: int, **kwargs) -> str:
         """Move drone forward."""
-        self.logger.info(f"➡️ Moving forward {distance}cm...")
+        _LOG.info("➡️ Moving forward %scm...", distance)
         
         if not self.drone_state.is_flying:
             return "Cannot move - drone is not flying! Use takeoff first."
@@ -77,19 +105,19 @@ class DroneController:
             return f"Moved forward {distance}cm (Movement #{self.drone_state.movement_count})"
         
         try:
-            success = self.drone.move_forward(distance)
+            success = await asyncio.to_thread(self.drone.move_forward, distance)
             if success:
-                self.drone_state.height = self.drone.get_height()
-                self.drone_state.battery = self.drone.get_battery()
+                await asyncio.to_thread(self._refresh_telemetry)
                 return f"Moved forward {distance}cm - height: {self.drone_state.height}cm, battery: {self.drone_state.battery}%"
             else:
                 return "Forward movement failed"
         except Exception as e:
             return f"Forward movement error: {str(e)}"
     
+    @_serialized
     async def move_backward(self, distance: int, **kwargs) -> str:
         """Move drone backward."""
-        self.logger.info(f"⬅️ Moving backward {distance}cm...")
+        _LOG.info("⬅️ Moving backward %scm...", distance)
         
         if not self.drone_state.is_flying:
             return "Cannot move - drone is not flying! Use takeoff first."
@@ -100,7 +128,7 @@ class DroneController:
             return f"Moved backward {distance}cm"
         
         try:
-            success = self.drone.move_back(distance)
+            success = await asyncio.to_thread(self.drone.move_back, distance)
             if success:
                 return f"Moved backward {distance}cm"
             else:
@@ -108,6 +136,7 @@ class DroneController:
         except Exception as e:
             return f"Backward movement error: {str(e)}"
     
+    @_serialized
     async def move_left(self, distance: int, **kwargs) -> str:
         """Move drone left."""
         if not self.drone_state.is_flying:
@@ -119,11 +148,12 @@ class DroneController:
             return f"Moved left {distance}cm"
         
         try:
-            success = self.drone.move_left(distance)
+            success = await asyncio.to_thread(self.drone.move_left, distance)
             return f"Moved left {distance}cm" if success else "Left movement failed"
         except Exception as e:
             return f"Left movement error: {str(e)}"
     
+    @_serialized
     async def move_right(self, distance: int, **kwargs) -> str:
         """Move drone right."""
         if not self.drone_state.is_flying:
@@ -135,11 +165,12 @@ class DroneController:
             return f"Moved right {distance}cm"
         
         try:
-            success = self.drone.move_right(distance)
+            success = await asyncio.to_thread(self.drone.move_right, distance)
             return f"Moved right {distance}cm" if success else "Right movement failed"
         except Exception as e:
             return f"Right movement error: {str(e)}"
     
+    @_serialized
     async def move_up(self, distance: int, **kwargs) -> str:
         """Move drone up."""
         if not self.drone_state.is_flying:
@@ -152,15 +183,16 @@ class DroneController:
             return f"Moved up {distance}cm - height: {self.drone_state.height}cm"
         
         try:
-            success = self.drone.move_up(distance)
+            success = await asyncio.to_thread(self.drone.move_up, distance)
             if success:
-                self.drone_state.height = self.drone.get_height()
+                self.drone_state.height = await asyncio.to_thread(self.drone.get_height)
                 return f"Moved up {distance}cm - height: {self.drone_state.height}cm"
             else:
                 return "Up movement failed"
         except Exception as e:
             return f"Up movement error: {str(e)}"
     
+    @_serialized
     async def move_down(self, distance: int, **kwargs) -> str:
         """Move drone down."""
         if not self.drone_state.is_flying:
@@ -173,15 +205,16 @@ class DroneController:
             return f"Moved down {distance}cm - height: {self.drone_state.height}cm"
         
         try:
-            success = self.drone.move_down(distance)
+            success = await asyncio.to_thread(self.drone.move_down, distance)
             if success:
-                self.drone_state.height = self.drone.get_height()
+                self.drone_state.height = await asyncio.to_thread(self.drone.get_height)
                 return f"Moved down {distance}cm - height: {self.drone_state.height}cm"
             else:
                 return "Down movement failed"
         except Exception as e:
             return f"Down movement error: {str(e)}"
     
+    @_serialized
     async def rotate_clockwise(self, angle: int, **kwargs) -> str:
         """Rotate drone clockwise."""
         if not self.drone_state.is_flying:
@@ -191,11 +224,12 @@ class DroneController:
             return f"Rotated clockwise {angle}°"
         
         try:
-            success = self.drone.rotate_clockwise(angle)
+            success = await asyncio.to_thread(self.drone.rotate_clockwise, angle)
             return f"Rotated clockwise {angle}°" if success else "Clockwise rotation failed"
         except Exception as e:
             return f"Clockwise rotation error: {str(e)}"
     
+    @_serialized
     async def rotate_counter_clockwise(self, angle: int, **kwargs) -> str:
         """Rotate drone counter-clockwise."""
         if not self.drone_state.is_flying:
@@ -205,38 +239,66 @@ class DroneController:
             return f"Rotated counter-clockwise {angle}°"
         
         try:
-            success = self.drone.rotate_counter_clockwise(angle)
+            success = await asyncio.to_thread(self.drone.rotate_counter_clockwise, angle)
             return f"Rotated counter-clockwise {angle}°" if success else "Counter-clockwise rotation failed"
         except Exception as e:
             return f"Counter-clockwise rotation error: {str(e)}"
     
     # Curve movement functions
+    def _validate_curve(self, x1: int, y1: int, z1: int, x2: int, y2: int, z2: int, speed: int) -> Optional[str]:
+        """Check Tello curve limits locally so invalid curves fail fast instead of after a drone round-trip."""
+        if not 10 <= speed <= 60:
+            return f"Curve speed must be 10-60cm/s (got {speed})"
+        
+        # Waypoint and destination are relative to the current position
+        for point in ((x1, y1, z1), (x2, y2, z2)):
+            for coord in point:
+                if not -500 <= coord <= 500:
+                    return f"Curve coordinates must be -500 to 500cm (got {coord})"
+            if all(abs(coord) < 20 for coord in point):
+                return "Each curve point must be at least 20cm from the current position on one axis"
+        
+        # Radius of the circle through the origin and both points: |a||b||a-b| / (2|a x b|)
+        cross = math.hypot(y1 * z2 - z1 * y2, z1 * x2 - x1 * z2, x1 * y2 - y1 * x2)
+        if cross == 0:
+            return "Curve points are in a straight line - use go_xyz_speed instead"
+        radius = math.hypot(x1, y1, z1) * math.hypot(x2, y2, z2) * math.hypot(x1 - x2, y1 - y2, z1 - z2) / (2 * cross)
+        if not 50 <= radius <= 1000:
+            return f"Curve radius must be 50-1000cm (got {radius:.0f}cm)"
+        
+        return None
+    
+    @_serialized
     async def curve_xyz_speed(self, x1: int, y1: int, z1: int, x2: int, y2: int, z2: int, speed: int, **kwargs) -> str:
         """Fly in a curve via waypoint to destination."""
-        self.logger.info(f"🌊 Curve movement: waypoint({x1},{y1},{z1}) → destination({x2},{y2},{z2}) at {speed}cm/s")
+        _LOG.info("🌊 Curve movement: waypoint(%s,%s,%s) → destination(%s,%s,%s) at %scm/s", x1, y1, z1, x2, y2, z2, speed)
         
         if not self.drone_state.is_flying:
             return "Cannot perform curve movement - drone is not flying! Use takeoff first."
         
+        curve_error = self._validate_curve(x1, y1, z1, x2, y2, z2, speed)
+        if curve_error:
+            return f"Invalid curve: {curve_error}"
+        
         self.drone_state.movement_count += 1
         
         if self.vision_only:
             return f"Curve movement completed: waypoint({x1},{y1},{z1}) → destination({x2},{y2},{z2})"
         
         try:
-            success = self.drone.curve_xyz_speed(x1, y1, z1, x2, y2, z2, speed)
+            success = await asyncio.to_thread(self.drone.curve_xyz_speed, x1, y1, z1, x2, y2, z2, speed)
             if success:
-                self.drone_state.height = self.drone.get_height()
-                self.drone_state.battery = self.drone.get_battery()
+                await asyncio.to_thread(self._refresh_telemetry)
                 return f"Curve movement completed - height: {self.drone_state.height}cm, battery: {self.drone_state.battery}%"
             else:
                 return "Curve movement failed"
         except Exception as e:
             return f"Curve movement error: {str(e)}"
     
+    @_serialized
     async def curve_right_arc(self, radius: int, angle: int = 90, speed: int = 30, **kwargs) -> str:
         """Fly in a rightward arc."""
-        self.logger.info(f"🌊➡️ Right arc: radius={radius}cm, angle={angle}°, speed={speed}cm/s")
+        _LOG.info("🌊➡️ Right arc: radius=%scm, angle=%s°, speed=%scm/s", radius, angle, speed)
         
         if not self.drone_state.is_flying:
             return "Cannot perform arc movement - drone is not flying! Use takeoff first."
@@ -247,7 +309,7 @@ class DroneController:
             return f"Right arc completed: {angle}° arc with {radius}cm radius"
         
         try:
-            success = self.drone.curve_right_arc(radius, angle, speed)
+            success = await asyncio.to_thread(self.drone.curve_right_arc, radius, angle, speed)
             if success:
                 return f"Right arc completed: {angle}° arc with {radius}cm radius"
             else:
@@ -255,9 +317,10 @@ class DroneController:
         except Exception as e:
             return f"Right arc movement error: {str(e)}"
     
+    @_serialized
     async def curve_left_arc(self, radius: int, angle: int = 90, speed: int = 30, **kwargs) -> str:
         """Fly in a leftward arc."""
-        self.logger.info(f"🌊⬅️ Left arc: radius={radius}cm, angle={angle}°, speed={speed}cm/s")
+        _LOG.info("🌊⬅️ Left arc: radius=%scm, angle=%s°, speed=%scm/s", radius, angle, speed)
         
         if not self.drone_state.is_flying:
             return "Cannot perform arc movement - drone is not flying! Use takeoff first."
@@ -268,7 +331,7 @@ class DroneController:
             return f"Left arc completed: {angle}° arc with {radius}cm radius"
         
         try:
-            success = self.drone.curve_left_arc(radius, angle, speed)
+            success = await asyncio.to_thread(self.drone.curve_left_arc, radius, angle, speed)
             if success:
                 return f"Left arc completed: {angle}° arc with {radius}cm radius"
             else:
@@ -276,9 +339,10 @@ class DroneController:
         except Exception as e:
             return f"Left arc movement error: {str(e)}"
     
+    @_serialized
     async def curve_forward_right(self, forward: int, right: int, speed: int = 30, **kwargs) -> str:
         """Fly in a smooth curve forward and right."""
-        self.logger.info(f"🌊↗️ Forward-right curve: forward={forward}cm, right={right}cm, speed={speed}cm/s")
+        _LOG.info("🌊↗️ Forward-right curve: forward=%scm, right=%scm, speed=%scm/s", forward, right, speed)
         
         if not self.drone_state.is_flying:
             return "Cannot perform curve movement - drone is not flying! Use takeoff first."
@@ -289,7 +353,7 @@ class DroneController:
             return f"Forward-right curve completed: {forward}cm forward, {right}cm right"
         
         try:
-            success = self.drone.curve_forward_right(forward, right, speed)
+            success = await asyncio.to_thread(self.drone.curve_forward_right, forward, right, speed)
             if success:
                 return f"Forward-right curve completed: {forward}cm forward, {right}cm right"
             else:
@@ -297,9 +361,10 @@ class DroneController:
         except Exception as e:
             return f"Forward-right curve error: {str(e)}"
     
+    @_serialized
     async def curve_forward_left(self, forward: int, left: int, speed: int = 30, **kwargs) -> str:
         """Fly in a smooth curve forward and left."""
-        self.logger.info(f"🌊↖️ Forward-left curve: forward={forward}cm, left={left}cm, speed={speed}cm/s")
+        _LOG.info("🌊↖️ Forward-left curve: forward=%scm, left=%scm, speed=%scm/s", forward, left, speed)
         
         if not self.drone_state.is_flying:
             return "Cannot perform curve movement - drone is not flying! Use takeoff first."
@@ -310,7 +375,7 @@ class DroneController:
             return f"Forward-left curve completed: {forward}cm forward, {left}cm left"
         
         try:
-            success = self.drone.curve_forward_left(forward, left, speed)
+            success = await asyncio.to_thread(self.drone.curve_forward_left, forward, left, speed)
             if success:
                 return f"Forward-left curve completed: {forward}cm forward, {left}cm left"
             else:
@@ -318,9 +383,10 @@ class DroneController:
         except Exception as e:
             return f"Forward-left curve error: {str(e)}"
     
+    @_serialized
     async def go_xyz_speed(self, x: int, y: int, z: int, speed: int, **kwargs) -> str:
         """Fly directly to XYZ coordinates with specified speed."""
-        self.logger.info(f"🎯 Direct movement: ({x},{y},{z}) at {speed}cm/s")
+        _LOG.info("🎯 Direct movement: (%s,%s,%s) at %scm/s", x, y, z, speed)
         
         if not self.drone_state.is_flying:
             return "Cannot perform direct movement - drone is not flying! Use takeoff first."
@@ -331,44 +397,120 @@ class DroneController:
             return f"Direct movement completed to ({x},{y},{z})"
         
         try:
-            success = self.drone.go_xyz_speed(x, y, z, speed)
+            success = await asyncio.to_thread(self.drone.go_xyz_speed, x, y, z, speed)
             if success:
-                self.drone_state.height = self.drone.get_height()
-                self.drone_state.battery = self.drone.get_battery()
+                await asyncio.to_thread(self._refresh_telemetry)
                 return f"Direct movement completed - height: {self.drone_state.height}cm, battery: {self.drone_state.battery}%"
             else:
                 return "Direct movement failed"
         except Exception as e:
             return f"Direct movement error: {str(e)}"
     
+    @_serialized
     async def get_drone_status(self, **kwargs) -> str:
         """Get current drone status."""
         if not self.vision_only:
             try:
-                self.drone_state.battery = self.drone.get_battery()
-                self.drone_state.height = self.drone.get_height()
+                await asyncio.to_thread(self._refresh_telemetry)
             except:
                 pass  # Ignore errors for mock testing
         
-        status = {
-            "flying": self.drone_state.is_flying,
-            "battery": self.drone_state.battery,
-            "height": self.drone_state.height,
-            "movements_made": self.drone_state.movement_count,
-            "mode": "VISION_ONLY" if self.vision_only else "REAL_DRONE"
-        }
-        
-        return f"Drone Status: Flying={status['flying']}, Battery={status['battery']}%, Height={status['height']}cm, Movements={status['movements_made']}"
+        state = self.drone_state
+        return f"Drone Status: Flying={state.is_flying}, Battery={state.battery}%, Height={state.height}cm, Movements={state.movement_count}"
     
     async def emergency_stop(self, **kwargs) -> str:
         """Emergency stop all drone movement."""
-        self.logger.warning("🚨 EMERGENCY STOP!")
+        # Deliberately not serialized - the stop must not queue behind a long move
+        _LOG.warning("🚨 EMERGENCY STOP!")
         
         if self.vision_only:
             return "EMERGENCY STOP executed (simulation mode)"
         
         try:
-            success = self.drone.emergency()
+            success = await asyncio.to_thread(self.drone.emergency)
             return "EMERGENCY STOP executed - drone should hover in place" if success else "Emergency stop failed"
         except Exception as e:
             return f"Emergency stop error: {str(e)}"
+    
+    # Fleet commands - the same SDK call is sent to every drone concurrently.
+    # drone_state tracks the primary drone (self.drones[0]), so it follows that drone's result.
+    async def _fanout(self, method_name: str, *args) -> List[Any]:
+        """Call a drone SDK method on all drones at once; failures are returned as exceptions."""
+        tasks = [asyncio.to_thread(getattr(drone, method_name), *args) for drone in self.drones]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+    
+    @staticmethod
+    def _fanout_succeeded(result: Any) -> bool:
+        """Whether one drone's fan-out result is a successful SDK call."""
+        return not isinstance(result, BaseException) and bool(result)
+    
+    def _fanout_summary(self, action: str, results: List[Any]) -> str:
+        """Summarize per-drone fan-out results in one line."""
+        ok = sum(1 for result in results if self._fanout_succeeded(result))
+        errors = [f"#{i + 1}: {result}" for i, result in enumerate(results) if isinstance(result, BaseException)]
+        summary = f"{action}: {ok}/{len(results)} drones succeeded"
+        return f"{summary} ({'; '.join(errors)})" if errors else summary
+    
+    @_serialized
+    async def broadcast_takeoff(self, **kwargs) -> str:
+        """Take off all drones."""
+        _LOG.info("🚁 Fleet takeoff (%d drones)...", len(self.drones))
+        
+        if self.drone_state.is_flying:
+            return "Drone is already flying!"
+        
+        if self.vision_only:
+            self.drone_state.is_flying = True
+            self.drone_state.height = 80
+            return f"Fleet takeoff successful ({len(self.drones)} drones, simulation mode)"
+        
+        results = await self._fanout("takeoff")
+        if self._fanout_succeeded(results[0]):
+            self.drone_state.is_flying = True
+            await asyncio.to_thread(self._refresh_telemetry)
+        return self._fanout_summary("Fleet takeoff", results)
+    
+    @_serialized
+    async def broadcast_land(self, **kwargs) -> str:
+        """Land all drones."""
+        _LOG.info("🛬 Fleet landing (%d drones)...", len(self.drones))
+        
+        if not self.drone_state.is_flying:
+            return "Drone is already on the ground!"
+        
+        if self.vision_only:
+            self.drone_state.is_flying = False
+            self.drone_state.height = 0
+            return f"Fleet landing successful ({len(self.drones)} drones, simulation mode)"
+        
+        results = await self._fanout("land")
+        if self._fanout_succeeded(results[0]):
+            self.drone_state.is_flying = False
+            self.drone_state.height = 0
+        return self._fanout_summary("Fleet landing", results)
+    
+    @_serialized
+    async def broadcast_move_forward(self, distance: int, **kwargs) -> str:
+        """Move all drones forward."""
+        _LOG.info("➡️ Fleet moving forward %scm (%d drones)...", distance, len(self.drones))
+        
+        if not self.drone_state.is_flying:
+            return "Cannot move - drone is not flying! Use takeoff first."
+        
+        self.drone_state.movement_count += 1
+        
+        if self.vision_only:
+            return f"Fleet moved forward {distance}cm ({len(self.drones)} drones, simulation mode)"
+        
+        results = await self._fanout("move_forward", distance)
+        if self._fanout_succeeded(results[0]):
+            await asyncio.to_thread(self._refresh_telemetry)
+        return self._fanout_summary(f"Fleet forward {distance}cm", results)
+    
+    async def broadcast_emergency_stop(self, **kwargs) -> str:
+        """Emergency stop all drones."""
+        # Not serialized, like emergency_stop
+        _LOG.warning("🚨 FLEET EMERGENCY STOP!")
+        if self.vision_only:
+            return "Fleet EMERGENCY STOP executed (simulation mode)"
+        return self._fanout_summary("Fleet EMERGENCY STOP", await self._fanout("emergency"))
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Frame Encoding Module for Drone Agent
+Encodes camera frames to JPEG, using libjpeg-turbo when available.
+"""
+
+import logging
+import cv2
+import numpy as np
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJPF_RGB, TJSAMP_420
+except ImportError:
+    TurboJPEG = None
+
+logger = logging.getLogger(__name__)
+
+_turbo_jpeg = None
+if TurboJPEG is not None:
+    try:
+        _turbo_jpeg = TurboJPEG()
+    except (OSError, RuntimeError) as e:
+        # Python bindings installed but the native libturbojpeg is missing
+        logger.warning(f"⚠️ libjpeg-turbo unavailable, falling back to OpenCV JPEG encoding: {e}")
+
+STREAM_SIZE = (640, 480)
+
+
+def encode_jpeg(frame: np.ndarray, quality: int = 80, rgb: bool = False,
+                size: tuple = None) -> bytes:
+    """Encode a frame to JPEG bytes.
+
+    ``rgb`` marks frames already in RGB order (drone camera) so the channel
+    swap is folded into the encoder instead of a separate cvtColor pass.
+    The frame is only resized when its shape differs from ``size``.
+    """
+    if size is not None and (frame.shape[1], frame.shape[0]) != size:
+        frame = cv2.resize(frame, size)
+
+    if _turbo_jpeg is not None:
+        return _turbo_jpeg.encode(
+            frame,
+            quality=quality,
+            pixel_format=TJPF_RGB if rgb else TJPF_BGR,
+            jpeg_subsample=TJSAMP_420
+        )
+
+    if rgb:
+        frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+    _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return buffer.tobytes()
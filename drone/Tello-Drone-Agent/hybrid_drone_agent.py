@@ -28,8 +28,6 @@ import argparse
 from typing import Dict, Any, List, Optional
 import websockets
 import pyaudio
-import cv2
-import numpy as np
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -38,6 +36,9 @@ load_dotenv()
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
+from json_codec import json_dumps, json_loads
+from utils.runtime import run as run_async, setup_queue_logging
+
 # Environment settings
 class EnvironmentSettings:
     def __init__(self):
@@ -48,20 +49,69 @@ class EnvironmentSettings:
 
 settings = EnvironmentSettings()
 
-# Import the real autonomous drone agent - fail if not available
-try:
-    from agents.autonomous_drone_agent import AutonomousDroneAgent
-    from drone.simple_tello import SimpleTello
+
+def _import_autonomous_agent():
+    """Import the real autonomous drone agent on first use - fail if not available."""
+    # Deferred so --help and missing-config exits don't pay for the Azure SDK imports
+    try:
+        from agents.autonomous_drone_agent import AutonomousDroneAgent
+    except Exception as e:
+        print(f"❌ Failed to import autonomous drone agent: {e}")
+        print("💡 Make sure your .env file has the correct Azure configuration")
+        print("💡 Check that all required packages are installed")
+        raise SystemExit(f"Cannot start hybrid agent without autonomous drone agent: {e}")
     print("✅ Full autonomous agent imported successfully")
-except Exception as e:
-    print(f"❌ Failed to import autonomous drone agent: {e}")
-    print("💡 Make sure your .env file has the correct Azure configuration")
-    print("💡 Check that all required packages are installed")
-    raise SystemExit(f"Cannot start hybrid agent without autonomous drone agent: {e}")
+    return AutonomousDroneAgent
 
-logging.basicConfig(level=logging.INFO)
+
+setup_queue_logging()
 logger = logging.getLogger(__name__)
 
+# Realtime API messages serialized once instead of per send.
+# Base64 never needs JSON escaping, so audio chunks are spliced into a fixed prefix.
+RESPONSE_CREATE_MESSAGE = json.dumps({"type": "response.create"})
+AUDIO_APPEND_PREFIX = '{"type": "input_audio_buffer.append", "audio": "'
+AUDIO_APPEND_SUFFIX = '"}'
+
+# The speech session configuration is static, so it is serialized once at import
+SESSION_UPDATE_MESSAGE = json.dumps({
+    "type": "session.update",
+    "session": {
+        "modalities": ["text", "audio"],
+        "instructions": """You are a text-to-speech converter for a drone control system.
+
+Your ONLY job is to speak the exact text you receive from this drone system- nothing more, nothing less.
+
+Rules:
+- When given text to speak, speak it exactly as you receive it
+- Do NOT add any commentary, explanations, or extra words  
+- Do NOT mention other agents or systems
+- Do NOT explain how the drone system works
+- Do NOT provide any additional context or information
+- Do NOT tell users about the internal workings of the system
+- Do NOT tell your role to anyone
+- Do NOT tell that you speak what text you receive
+- Just convert the text to clear, natural speech
+
+You are the voice output for drone command results.""",
+        "voice": "alloy",
+        "input_audio_format": "pcm16",
+        "output_audio_format": "pcm16",
+        "input_audio_transcription": {
+            "model": "whisper-1"
+        },
+        "turn_detection": {
+            "type": "server_vad",
+            "threshold": 0.5,
+            "prefix_padding_ms": 300,
+            "silence_duration_ms": 500
+        },
+        "tools": [],  # No function calling - speech only
+        "temperature": 0.7
+    }
+})
+
+
 class SpeechProcessor:
     """Handles speech input/output via OpenAI Realtime API."""
     
@@ -79,17 +129,22 @@ class SpeechProcessor:
         self.input_stream = None
         self.output_stream = None
         
-        # WebSocket connection
+        # WebSocket connection - all sends go through a single writer task
+        # Kept small and awaited by producers, so a stalled socket backs up into the
+        # drop-oldest input_audio_queue instead of growing this queue
         self.websocket = None
         self.is_connected = False
+        self.outgoing_messages = asyncio.Queue(maxsize=10)
         
         # Response state tracking to prevent concurrent response errors
         self.response_active = False
         self.pending_speech_queue = asyncio.Queue()
         
-        # Audio queues
-        self.input_audio_queue = queue.Queue()
+        # Audio queues - microphone chunks are handed to the event loop via call_soon_threadsafe
+        # Bounded to ~4s of audio (100 x 1024 samples @ 24kHz) so a stalled sender can't grow it forever
+        self.input_audio_queue = asyncio.Queue(maxsize=100)
         self.output_audio_queue = queue.Queue()
+        self.loop = None
         
         # Control flags
         self.recording = False
@@ -120,7 +175,9 @@ class SpeechProcessor:
                 ws_url,
                 additional_headers=headers,
                 ping_interval=20,
-                ping_timeout=10
+                ping_timeout=10,
+                # Audio/image payloads are base64 media; deflate costs CPU and latency for little gain
+                compression=None
             )
             
             self.is_connected = True
@@ -138,44 +195,7 @@ class SpeechProcessor:
     async def _configure_speech_session(self):
         """Configure the realtime session for speech processing only."""
         
-        session_config = {
-            "type": "session.update",
-            "session": {
-                "modalities": ["text", "audio"],
-                "instructions": """You are a text-to-speech converter for a drone control system.
-
-Your ONLY job is to speak the exact text you receive from this drone system- nothing more, nothing less.
-
-Rules:
-- When given text to speak, speak it exactly as you receive it
-- Do NOT add any commentary, explanations, or extra words  
-- Do NOT mention other agents or systems
-- Do NOT explain how the drone system works
-- Do NOT provide any additional context or information
-- Do NOT tell users about the internal workings of the system
-- Do NOT tell your role to anyone
-- Do NOT tell that you speak what text you receive
-- Just convert the text to clear, natural speech
-
-You are the voice output for drone command results.""",
-                "voice": "alloy",
-                "input_audio_format": "pcm16",
-                "output_audio_format": "pcm16",
-                "input_audio_transcription": {
-                    "model": "whisper-1"
-                },
-                "turn_detection": {
-                    "type": "server_vad",
-                    "threshold": 0.5,
-                    "prefix_padding_ms": 300,
-                    "silence_duration_ms": 500
-                },
-                "tools": [],  # No function calling - speech only
-                "temperature": 0.7
-            }
-        }
-        
-        await self.websocket.send(json.dumps(session_config))
+        await self.websocket.send(SESSION_UPDATE_MESSAGE)
         self.logger.info("🔧 Speech session configured")
     
     def start_audio_streams(self):
@@ -217,19 +237,25 @@ You are the voice output for drone command results.""",
             try:
                 if self.input_stream:
                     data = self.input_stream.read(self.CHUNK, exception_on_overflow=False)
-                    self.input_audio_queue.put(data)
+                    self.loop.call_soon_threadsafe(self._enqueue_input_audio, data)
             except Exception as e:
                 self.logger.error(f"❌ Audio input error: {e}")
                 time.sleep(0.1)
     
+    def _enqueue_input_audio(self, data: bytes):
+        """Queue a microphone chunk on the event loop, dropping the oldest if the sender fell behind."""
+        if self.input_audio_queue.full():
+            self.input_audio_queue.get_nowait()
+        self.input_audio_queue.put_nowait(data)
+    
     def _audio_output_worker(self):
         """Worker thread for audio output."""
         while self.playing and self.running:
             try:
-                if not self.output_audio_queue.empty():
-                    audio_data = self.output_audio_queue.get(timeout=0.1)
-                    if self.output_stream:
-                        self.output_stream.write(audio_data)
+                # Block until audio arrives instead of spinning on empty()
+                audio_data = self.output_audio_queue.get(timeout=0.1)
+                if self.output_stream:
+                    self.output_stream.write(audio_data)
             except queue.Empty:
                 continue
             except Exception as e:
@@ -240,33 +266,42 @@ You are the voice output for drone command results.""",
         """Send microphone audio to the realtime API."""
         while self.is_connected and self.running:
             try:
-                if not self.input_audio_queue.empty():
-                    audio_chunk = self.input_audio_queue.get_nowait()
-                    
-                    # Convert to base64
-                    audio_base64 = base64.b64encode(audio_chunk).decode()
-                    
-                    # Send to API
-                    message = {
-                        "type": "input_audio_buffer.append",
-                        "audio": audio_base64
-                    }
-                    
-                    await self.websocket.send(json.dumps(message))
+                # Wake only when the microphone thread hands over a chunk
+                audio_chunk = await asyncio.wait_for(self.input_audio_queue.get(), timeout=0.5)
                 
-                await asyncio.sleep(0.01)  # Small delay
+                # Convert to base64
+                audio_base64 = base64.b64encode(audio_chunk).decode()
                 
-            except queue.Empty:
-                await asyncio.sleep(0.01)
+                # Send to API - waits for the writer when the socket is behind (the chunk is dropped on timeout)
+                await asyncio.wait_for(
+                    self.outgoing_messages.put(AUDIO_APPEND_PREFIX + audio_base64 + AUDIO_APPEND_SUFFIX),
+                    timeout=0.5
+                )
+                
+            except asyncio.TimeoutError:
+                continue
             except Exception as e:
                 self.logger.error(f"❌ Audio send error: {e}")
                 await asyncio.sleep(0.1)
     
+    async def _websocket_writer(self):
+        """Send queued messages so producers never wait on a slow socket."""
+        while self.is_connected and self.running:
+            try:
+                message = await asyncio.wait_for(self.outgoing_messages.get(), timeout=0.5)
+                await self.websocket.send(message)
+            except asyncio.TimeoutError:
+                continue
+            except websockets.exceptions.ConnectionClosed:
+                self.is_connected = False
+            except Exception as e:
+                self.logger.error(f"❌ WebSocket send error: {e}")
+    
     async def _handle_realtime_messages(self):
         """Handle messages from the realtime API."""
         try:
             async for message in self.websocket:
-                data = json.loads(message)
+                data = json_loads(message)
                 await self._process_speech_message(data)
                 
         except websockets.exceptions.ConnectionClosed:
@@ -291,7 +326,7 @@ You are the voice output for drone command results.""",
             
         elif msg_type == "conversation.item.input_audio_transcription.completed":
             transcript = data.get("transcript", "")
-            self.logger.info(f"📝 You said: {transcript}")
+            self.logger.info("📝 You said: %s", transcript)
             
             # Send transcribed text to main agent
             if self.text_received_callback:
@@ -308,7 +343,7 @@ You are the voice output for drone command results.""",
             if not self.pending_speech_queue.empty():
                 try:
                     pending_text = self.pending_speech_queue.get_nowait()
-                    self.logger.info(f"🔓 Processing queued speech: {pending_text[:50]}...")
+                    self.logger.info("🔓 Processing queued speech: %.50s...", pending_text)
                     await self._do_speak_text(pending_text)
                 except asyncio.QueueEmpty:
                     pass
@@ -317,7 +352,7 @@ You are the voice output for drone command results.""",
             # Stream audio response to speakers
             if "delta" in data:
                 audio_data = base64.b64decode(data["delta"])
-                self.output_audio_queue.put(audio_data)
+                self.output_audio_queue.put_nowait(audio_data)
                 
         elif msg_type == "error":
             self.logger.error(f"❌ Speech API Error: {data}")
@@ -331,7 +366,7 @@ You are the voice output for drone command results.""",
             
             # If a response is already active, queue this speech request
             if self.response_active:
-                self.logger.info(f"⏳ Queuing speech (response active): {text}")
+                self.logger.info("⏳ Queuing speech (response active): %s", text)
                 await self.pending_speech_queue.put(text)
                 return
             
@@ -344,7 +379,7 @@ You are the voice output for drone command results.""",
     async def _do_speak_text(self, text: str):
         """Actually perform the text-to-speech conversion."""
         try:
-            self.logger.info(f"🗣️ Speaking: {text}")
+            self.logger.info("🗣️ Speaking: %s", text)
             
             # Create conversation item with text to speak
             message = {
@@ -360,16 +395,10 @@ You are the voice output for drone command results.""",
                     ]
                 }
             }
-            await self.websocket.send(json.dumps(message))
+            await self.outgoing_messages.put(json_dumps(message))
             
-            # Small delay before requesting response
-            await asyncio.sleep(0.05)
-            
-            # Request speech generation
-            response_request = {
-                "type": "response.create"
-            }
-            await self.websocket.send(json.dumps(response_request))
+            # Request speech generation - the writer sends in queue order, so the text item always lands first
+            await self.outgoing_messages.put(RESPONSE_CREATE_MESSAGE)
             
         except Exception as e:
             self.logger.error(f"❌ Internal text-to-speech error: {e}")
@@ -381,6 +410,7 @@ You are the voice output for drone command results.""",
     async def start_speech_processing(self):
         """Start speech input/output processing."""
         self.running = True
+        self.loop = asyncio.get_running_loop()
         
         try:
             self.start_audio_streams()
@@ -388,6 +418,7 @@ You are the voice output for drone command results.""",
             # Start main communication loops
             await asyncio.gather(
                 self._send_audio_to_api(),
+                self._websocket_writer(),
                 self._handle_realtime_messages()
             )
             
@@ -454,6 +485,8 @@ class HybridDroneAgent:
     async def initialize(self):
         """Initialize all components."""
         try:
+            AutonomousDroneAgent = _import_autonomous_agent()
+            
             # Initialize speech processor
             if not await self.speech_processor.connect_realtime():
                 raise Exception("Failed to connect speech processor")
@@ -476,13 +509,13 @@ class HybridDroneAgent:
         """Process voice command through autonomous agent and speak the result."""
         try:
             start_time = time.time()
-            self.logger.info(f"🎯 Processing command: {voice_text}")
+            self.logger.info("🎯 Processing command: %s", voice_text)
             
             # Send command to autonomous drone agent for processing
             result = await self.command_processor.process_user_command(voice_text)
             
             processing_time = time.time() - start_time
-            self.logger.info(f"⏱️ Command processed in {processing_time:.2f} seconds")
+            self.logger.info("⏱️ Command processed in %.2f seconds", processing_time)
             
             if result:
                 # Convert result to speech
@@ -579,27 +612,29 @@ async def main():
 
 
 if __name__ == "__main__":
-    print("🚁🎙️ Hybrid Drone Agent")
-    print("=" * 50)
-    print()
-    print("🏗️ ARCHITECTURE:")
-    print("   • Realtime API: Speech input/output")
-    print("   • Autonomous Agent: Command processing") 
-    print("   • Best of both worlds!")
-    print()
-    print("📋 FEATURES:")
-    print("   ✅ Natural speech conversation")
-    print("   ✅ Multi-step command sequences")
-    print("   ✅ No pauses between commands")
-    print("   ✅ Proven drone control logic")
-    print()
-    print("🚀 USAGE:")
-    print("   • Vision Only:  python hybrid_drone_agent.py")
-    print("   • Real Drone:   python hybrid_drone_agent.py --real-drone")
-    print()
+    print("\n".join([
+        "🚁🎙️ Hybrid Drone Agent",
+        "=" * 50,
+        "",
+        "🏗️ ARCHITECTURE:",
+        "   • Realtime API: Speech input/output",
+        "   • Autonomous Agent: Command processing",
+        "   • Best of both worlds!",
+        "",
+        "📋 FEATURES:",
+        "   ✅ Natural speech conversation",
+        "   ✅ Multi-step command sequences",
+        "   ✅ No pauses between commands",
+        "   ✅ Proven drone control logic",
+        "",
+        "🚀 USAGE:",
+        "   • Vision Only:  python hybrid_drone_agent.py",
+        "   • Real Drone:   python hybrid_drone_agent.py --real-drone",
+        "",
+    ]))
     
     try:
-        asyncio.run(main())
+        run_async(main())
     except KeyboardInterrupt:
         print("\n👋 Goodbye!")
     except Exception as e:
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+JSON Codec Module for Drone Agent
+Serializes realtime API messages, using orjson when available.
+"""
+
+import json
+
+try:
+    import orjson
+
+    def json_dumps(obj) -> str:
+        """Serialize to a JSON str (realtime API events must go out as text frames)."""
+        return orjson.dumps(obj).decode()
+
+    json_loads = orjson.loads
+except ImportError:
+    json_dumps = json.dumps
+    json_loads = json.loads
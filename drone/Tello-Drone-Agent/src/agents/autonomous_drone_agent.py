@@ -4,10 +4,15 @@ Provides intelligent drone control with computer vision and safety protocols.
 """
 
 import os
+import asyncio
+import concurrent.futures
 import logging
 import json
+import threading
 import time
 import base64
+import itertools
+from collections import deque
 import cv2
 import numpy as np
 from typing import Dict, Any, List, Optional
@@ -16,6 +21,11 @@ from azure.ai.projects import AIProjectClient
 from azure.identity import DefaultAzureCredential
 from azure.ai.agents.models import FunctionTool
 
+from utils.runtime import run as run_async
+
+# Suffix for capture filenames, which otherwise only carry a %Y%m%d_%H%M%S timestamp
+_capture_counter = itertools.count()
+
 # Try imports with error handling
 try:
     from config.settings import settings
@@ -52,8 +62,12 @@ except ImportError:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Suppress Azure HTTP logging for cleaner output
+logging.getLogger('azure.core.pipeline.policies.http_logging_policy').setLevel(logging.WARNING)
+logging.getLogger('azure.identity').setLevel(logging.WARNING)
+
 
-@dataclass
+@dataclass(slots=True)
 class DroneState:
     """Track drone state and flight history."""
     is_flying: bool = False
@@ -72,7 +86,7 @@ class AutonomousDroneAgent:
     """Autonomous drone controller with computer vision and SimpleTello integration."""
     
     def __init__(self, vision_only: bool = False):
-        self.logger = logging.getLogger(__name__)
+        self.logger = logger
         self.vision_only = vision_only
         
         # Core components
@@ -83,12 +97,18 @@ class AutonomousDroneAgent:
         self.drone_state = DroneState()
         
         # Conversation memory for context
-        self.conversation_history: List[Dict] = []
-        self.image_history: List[Dict] = []
+        # Bounded so long sessions don't grow memory without limit; only the latest entries are ever read
+        self.conversation_history: deque = deque(maxlen=100)
+        self.image_history: deque = deque(maxlen=50)
         
         # Track background save threads
         self.background_save_threads: List = []
         
+        # Tool calls arrive one at a time from the agent run, so one reusable worker thread serves them all
+        self._tool_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="drone_tool")
+        # Event loop reused by that worker for every tool coroutine
+        self._tool_loop = asyncio.new_event_loop()
+        
         # Initialize Azure AI
         self._setup_ai_client()
         
@@ -114,10 +134,6 @@ class AutonomousDroneAgent:
     
     def _setup_ai_client(self):
         """Initialize Azure AI Projects client."""
-        # Suppress Azure HTTP logging for cleaner output
-        logging.getLogger('azure.core.pipeline.policies.http_logging_policy').setLevel(logging.WARNING)
-        logging.getLogger('azure.identity').setLevel(logging.WARNING)
-        
         try:
             self.logger.info("Setting up Azure AI Projects client...")
             credential = DefaultAzureCredential()
@@ -193,53 +209,45 @@ You are cautious, methodical, and always prioritize safety over speed.""",
             self.logger.error(f"❌ Failed to create agent: {e}")
             raise
     
+    def _run_tool_coroutine(self, coro):
+        """Run an async tool implementation in a separate thread to avoid event loop conflicts."""
+        def run_in_thread():
+            asyncio.set_event_loop(self._tool_loop)
+            return self._tool_loop.run_until_complete(coro)
+        
+        future = self._tool_executor.submit(run_in_thread)
+        return future.result(timeout=30)  # 30 second timeout
+    
     def _register_functions(self):
         """Register drone control functions for auto execution."""
-        # Create synchronous wrapper functions with exact tool names
-        import asyncio
-        import concurrent.futures
-        import threading
-        
-        def run_async_in_thread(coro):
-            """Run async function in a separate thread to avoid event loop conflicts"""
-            def run_in_thread():
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    return loop.run_until_complete(coro)
-                finally:
-                    loop.close()
-            
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(run_in_thread)
-                return future.result(timeout=30)  # 30 second timeout
-        
+        # Synchronous wrappers with exact tool names - auto function calling matches on
+        # __name__ and signature, so these stay thin one-line delegates
         def takeoff(): 
-            return run_async_in_thread(self._takeoff())
+            return self._run_tool_coroutine(self._takeoff())
         def land(): 
-            return run_async_in_thread(self._land())
+            return self._run_tool_coroutine(self._land())
         def move_forward(distance: int): 
-            return run_async_in_thread(self._move_forward(distance))
+            return self._run_tool_coroutine(self._move_forward(distance))
         def move_backward(distance: int): 
-            return run_async_in_thread(self._move_back(distance))
+            return self._run_tool_coroutine(self._move_back(distance))
         def move_left(distance: int): 
-            return run_async_in_thread(self._move_left(distance))
+            return self._run_tool_coroutine(self._move_left(distance))
         def move_right(distance: int): 
-            return run_async_in_thread(self._move_right(distance))
+            return self._run_tool_coroutine(self._move_right(distance))
         def move_up(distance: int): 
-            return run_async_in_thread(self._move_up(distance))
+            return self._run_tool_coroutine(self._move_up(distance))
         def move_down(distance: int): 
-            return run_async_in_thread(self._move_down(distance))
+            return self._run_tool_coroutine(self._move_down(distance))
         def rotate_clockwise(angle: int): 
-            return run_async_in_thread(self._rotate_clockwise(angle))
+            return self._run_tool_coroutine(self._rotate_clockwise(angle))
         def rotate_counter_clockwise(angle: int): 
-            return run_async_in_thread(self._rotate_counter_clockwise(angle))
+            return self._run_tool_coroutine(self._rotate_counter_clockwise(angle))
         def get_drone_status(): 
             return self._get_drone_status()  # This is sync, no need for async runner
         def capture_image_and_analyze(focus: str, object_description: str = ""): 
-            return run_async_in_thread(self._capture_image_and_analyze(focus, object_description))
+            return self._run_tool_coroutine(self._capture_image_and_analyze(focus, object_description))
         def emergency_stop(): 
-            return run_async_in_thread(self._emergency_stop())
+            return self._run_tool_coroutine(self._emergency_stop())
 
         # Register tool functions for auto execution
         functions_list = [
@@ -490,7 +498,7 @@ You are cautious, methodical, and always prioritize safety over speed.""",
     
     async def _move_forward(self, distance: int) -> str:
         """Move drone forward."""
-        self.logger.info(f"➡️ Moving forward {distance}cm...")
+        self.logger.info("➡️ Moving forward %scm...", distance)
         
         if not self.drone_state.is_flying:
             return "❌ Cannot move - drone is not flying! Use takeoff first."
@@ -513,7 +521,7 @@ You are cautious, methodical, and always prioritize safety over speed.""",
     
     async def _move_back(self, distance: int) -> str:
         """Move drone backward."""
-        self.logger.info(f"⬅️ Moving back {distance}cm...")
+        self.logger.info("⬅️ Moving back %scm...", distance)
         
         if not self.drone_state.is_flying:
             return "❌ Cannot move - drone is not flying! Use takeoff first."
@@ -535,7 +543,7 @@ You are cautious, methodical, and always prioritize safety over speed.""",
     
     async def _move_up(self, distance: int) -> str:
         """Move drone up."""
-        self.logger.info(f"⬆️ Moving up {distance}cm...")
+        self.logger.info("⬆️ Moving up %scm...", distance)
         
         if not self.drone_state.is_flying:
             return "❌ Cannot move - drone is not flying! Use takeoff first."
@@ -558,7 +566,7 @@ You are cautious, methodical, and always prioritize safety over speed.""",
     
     async def _move_down(self, distance: int) -> str:
         """Move drone down."""
-        self.logger.info(f"⬇️ Moving down {distance}cm...")
+        self.logger.info("⬇️ Moving down %scm...", distance)
         
         if not self.drone_state.is_flying:
             return "❌ Cannot move - drone is not flying! Use takeoff first."
@@ -581,7 +589,7 @@ You are cautious, methodical, and always prioritize safety over speed.""",
     
     async def _move_left(self, distance: int) -> str:
         """Move drone left."""
-        self.logger.info(f"⬅️ Moving left {distance}cm...")
+        self.logger.info("⬅️ Moving left %scm...", distance)
         
         if not self.drone_state.is_flying:
             return "❌ Cannot move - drone is not flying! Use takeoff first."
@@ -602,7 +610,7 @@ You are cautious, methodical, and always prioritize safety over speed.""",
     
     async def _move_right(self, distance: int) -> str:
         """Move drone right."""
-        self.logger.info(f"➡️ Moving right {distance}cm...")
+        self.logger.info("➡️ Moving right %scm...", distance)
         
         if not self.drone_state.is_flying:
             return "❌ Cannot move - drone is not flying! Use takeoff first."
@@ -623,7 +631,7 @@ You are cautious, methodical, and always prioritize safety over speed.""",
     
     async def _rotate_clockwise(self, angle: int) -> str:
         """Rotate drone clockwise."""
-        self.logger.info(f"🔄 Rotating clockwise {angle}°...")
+        self.logger.info("🔄 Rotating clockwise %s°...", angle)
         
         if not self.drone_state.is_flying:
             return "❌ Cannot rotate - drone is not flying! Use takeoff first."
@@ -642,7 +650,7 @@ You are cautious, methodical, and always prioritize safety over speed.""",
     
     async def _rotate_counter_clockwise(self, angle: int) -> str:
         """Rotate drone counter-clockwise."""
-        self.logger.info(f"🔄 Rotating counter-clockwise {angle}°...")
+        self.logger.info("🔄 Rotating counter-clockwise %s°...", angle)
         
         if not self.drone_state.is_flying:
             return "❌ Cannot rotate - drone is not flying! Use takeoff first."
@@ -678,7 +686,7 @@ You are cautious, methodical, and always prioritize safety over speed.""",
     
     async def _capture_image_and_analyze(self, focus: str, object_description: str = "") -> str:
         """Capture image and analyze using GPT-4o vision."""
-        self.logger.info(f"📸 Capturing image and analyzing for: {focus}")
+        self.logger.info("📸 Capturing image and analyzing for: %s", focus)
         
         if self.vision_only:
             # Simulate image analysis for testing
@@ -716,9 +724,8 @@ You are cautious, methodical, and always prioritize safety over speed.""",
             image_base64 = base64.b64encode(buffer).decode('utf-8')
             
             # Prepare image filename for later saving (don't save yet)
-            import datetime
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            image_filename = f"drone_capture_{focus}_{timestamp}.jpg"
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            image_filename = f"drone_capture_{focus}_{timestamp}_{next(_capture_counter)}.jpg"
             image_path = os.path.join("images", image_filename)
             
             # Create analysis prompt based on focus
@@ -798,11 +805,11 @@ You are cautious, methodical, and always prioritize safety over speed.""",
                     self.logger.warning(f"⚠️ Failed to save image: {e}")
             
             # Start background save (non-blocking)
-            import threading
             save_thread = threading.Thread(target=save_image_async, daemon=True)
             save_thread.start()
             
-            # Keep track of background threads for cleanup
+            # Keep track of in-flight background threads for cleanup (finished saves are dropped)
+            self.background_save_threads = [t for t in self.background_save_threads if t.is_alive()]
             self.background_save_threads.append(save_thread)
             
             # Store analysis result
@@ -842,7 +849,7 @@ You are cautious, methodical, and always prioritize safety over speed.""",
     async def process_user_command(self, user_input: str) -> str:
         """Process user command and execute autonomous drone actions."""
         try:
-            self.logger.info(f"🎯 Processing command: {user_input}")
+            self.logger.info("🎯 Processing command: %s", user_input)
             
             # Store in conversation history
             self.conversation_history.append({
@@ -851,27 +858,8 @@ You are cautious, methodical, and always prioritize safety over speed.""",
                 "type": "user_command"
             })
             
-            # Send to Azure AI agent
-            message = self.ai_client.agents.messages.create(
-                thread_id=self.thread.id,
-                role="user",
-                content=user_input
-            )
-            
-            # Process with agent
-            run = self.ai_client.agents.runs.create_and_process(
-                thread_id=self.thread.id,
-                agent_id=self.agent.id
-            )
-            
-            # Get response
-            messages = self.ai_client.agents.messages.list(
-                thread_id=self.thread.id,
-                limit=1,
-                order="desc"
-            )
-            
-            message_list = list(messages)
+            # The Azure SDK calls block until the run finishes - keep them off the event loop
+            message_list = await asyncio.to_thread(self._run_agent_turn, user_input)
             if message_list and hasattr(message_list[0], 'content'):
                 response = message_list[0].content[0].text.value
                 
@@ -887,15 +875,38 @@ You are cautious, methodical, and always prioritize safety over speed.""",
                 return "✅ Command executed successfully."
                 
         except Exception as e:
-            self.logger.error(f"❌ Error processing command: {e}")
+            self.logger.error("❌ Error processing command: %s", e)
             return f"❌ Error: {str(e)}"
     
+    def _run_agent_turn(self, user_input: str) -> List:
+        """Send a message to the Azure AI agent, process the run and return the latest message."""
+        # Send to Azure AI agent
+        self.ai_client.agents.messages.create(
+            thread_id=self.thread.id,
+            role="user",
+            content=user_input
+        )
+        
+        # Process with agent
+        self.ai_client.agents.runs.create_and_process(
+            thread_id=self.thread.id,
+            agent_id=self.agent.id
+        )
+        
+        # Get response
+        messages = self.ai_client.agents.messages.list(
+            thread_id=self.thread.id,
+            limit=1,
+            order="desc"
+        )
+        return list(messages)
+    
     def get_conversation_context(self) -> Dict:
         """Get conversation and flight context."""
         return {
             "drone_state": asdict(self.drone_state),
-            "recent_conversation": self.conversation_history[-5:],  # Last 5 exchanges
-            "recent_images": self.image_history[-3:],  # Last 3 image analyses
+            "recent_conversation": list(self.conversation_history)[-5:],  # Last 5 exchanges
+            "recent_images": list(self.image_history)[-3:],  # Last 3 image analyses
             "agent_id": self.agent.id if self.agent else None,
             "thread_id": self.thread.id if self.thread else None,
             "mode": "VISION_ONLY" if self.vision_only else "REAL_DRONE"
@@ -914,6 +925,10 @@ You are cautious, methodical, and always prioritize safety over speed.""",
                         thread.join(timeout=5)  # Wait max 5 seconds per thread
                 self.logger.info("✅ Background threads completed")
             
+            # Close the tool loop on its own worker thread, after any tool call still running
+            self._tool_executor.submit(self._tool_loop.close)
+            self._tool_executor.shutdown(wait=False)
+            
             # Clean up drone
             if self.drone and not self.vision_only:
                 try:
@@ -957,13 +972,27 @@ You are cautious, methodical, and always prioritize safety over speed.""",
             self.logger.error(f"❌ Cleanup error: {e}")
 
 
+# Reduced test commands for faster testing
+TEST_COMMANDS = (
+    "Take off and hover",
+    "Tell me your current status",
+    "Land safely"
+)
+
+
+async def _safe_run(agent: AutonomousDroneAgent, command: str):
+    """Run one command and return (response, error) instead of raising."""
+    try:
+        return await agent.process_user_command(command), None
+    except Exception as e:
+        return None, e
+
+
 # Test function
 def test_autonomous_agent():
     """Test the autonomous drone agent."""
     logger.info("🚁 Testing Autonomous Drone Agent")
     
-    import asyncio
-    
     async def test_agent():
         agent = None
         try:
@@ -971,30 +1000,21 @@ def test_autonomous_agent():
             agent = AutonomousDroneAgent(vision_only=True)
             logger.info("✅ Agent created successfully")
             
-            # Reduced test commands for faster testing
-            test_commands = [
-                "Take off and hover",
-                "Tell me your current status",
-                "Land safely"
-            ]
-            
-            for i, cmd in enumerate(test_commands, 1):
-                logger.info(f"\n🎯 Test {i}/{len(test_commands)}: '{cmd}'")
-                try:
-                    response = await agent.process_user_command(cmd)
-                    logger.info(f"🤖 Response: {response}")
-                    
-                    # Show context
-                    context = agent.get_conversation_context()
-                    logger.info(f"📊 Drone State: Flying={context['drone_state']['is_flying']}, Movements={context['drone_state']['movement_count']}")
-                except Exception as e:
-                    logger.error(f"❌ Command {i} failed: {e}")
+            for i, cmd in enumerate(TEST_COMMANDS, 1):
+                logger.info("\n🎯 Test %d/%d: '%s'", i, len(TEST_COMMANDS), cmd)
+                response, error = await _safe_run(agent, cmd)
+                if error:
+                    logger.error("❌ Command %d failed: %s", i, error)
                     break
+                logger.info("🤖 Response: %s", response)
+                
+                # Show drone state (read directly - the full conversation context isn't needed here)
+                logger.info("📊 Drone State: Flying=%s, Movements=%s", agent.drone_state.is_flying, agent.drone_state.movement_count)
             
             logger.info("✅ Test completed successfully!")
             
         except Exception as e:
-            logger.error(f"❌ Test error: {e}")
+            logger.error("❌ Test error: %s", e)
         finally:
             # Ensure cleanup always happens
             if agent:
@@ -1005,7 +1025,7 @@ def test_autonomous_agent():
                     logger.warning(f"⚠️ Cleanup warning: {e}")
     
     try:
-        asyncio.run(test_agent())
+        run_async(test_agent())
     except KeyboardInterrupt:
         logger.info("🛑 Test interrupted by user")
     except Exception as e:
@@ -1076,10 +1096,10 @@ def test_autonomous_agent():
         self.drone_state = DroneState()
         
         # Clear conversation history
-        self.conversation_history = []
+        self.conversation_history.clear()
         
         # Reset image history
-        self.recent_images = []
+        self.image_history.clear()
         
         # Reset any movement tracking
         self.drone_state.movement_count = 0
@@ -5,6 +5,10 @@ Provides real-time object detection and analysis using Azure AI Vision API.
 
 import logging
 import asyncio
+import itertools
+import os
+import threading
+import time
 from typing import List, Dict, Any, Optional
 import numpy as np
 from PIL import Image
@@ -17,6 +21,9 @@ from azure.identity import DefaultAzureCredential
 
 from config.settings import settings, config_manager
 
+# Per-process sequence so debug images never overwrite each other
+_debug_image_counter = itertools.count()
+
 
 class VisionAgent:
     """
@@ -30,6 +37,11 @@ class VisionAgent:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.client = None
+        
+        # Background event loop shared by the synchronous helpers (started on first use)
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        
         self._setup_ai_vision()
     
     def _setup_ai_vision(self):
@@ -66,7 +78,6 @@ class VisionAgent:
             Analysis results including objects, descriptions, and counts
         """
         try:
-            import time
             start_time = time.time()
             
             # Convert image to bytes
@@ -344,16 +355,13 @@ class VisionAgent:
     def _save_debug_image(self, image, image_bytes: bytes):
         """Save debug image to see what's being analyzed."""
         try:
-            import os
-            import time
-            
             # Create debug directory
             debug_dir = "debug_images"
             os.makedirs(debug_dir, exist_ok=True)
             
             # Save with timestamp
             timestamp = int(time.time() * 1000)
-            filename = f"{debug_dir}/debug_image_{timestamp}.jpg"
+            filename = f"{debug_dir}/debug_image_{timestamp}_{next(_debug_image_counter)}.jpg"
             
             # Save the actual bytes being sent to API
             with open(filename, 'wb') as f:
@@ -376,6 +384,14 @@ class VisionAgent:
             "timestamp": asyncio.get_event_loop().time()
         }
     
+    def _run_sync(self, coro, timeout: float = 30):
+        """Run a coroutine on the agent's background event loop and wait for its result."""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, daemon=True, name="vision_agent_loop").start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout=timeout)
+    
     def count_objects_in_image(self, image: np.ndarray, object_type: str) -> int:
         """
         Count specific objects in the image.
@@ -387,7 +403,7 @@ class VisionAgent:
         Returns:
             Number of objects found
         """
-        analysis = asyncio.run(self.analyze_image(image, f"count {object_type}"))
+        analysis = self._run_sync(self.analyze_image(image, f"count {object_type}"))
         objects = analysis.get("objects", [])
         people = analysis.get("people", [])
         all_items = objects + people
@@ -410,7 +426,7 @@ class VisionAgent:
         Returns:
             Scene summary text
         """
-        analysis = asyncio.run(self.analyze_image(image))
+        analysis = self._run_sync(self.analyze_image(image))
         
         description = analysis.get("description", "")
         objects = analysis.get("objects", [])
@@ -449,7 +465,7 @@ class VisionAgent:
         Returns:
             Navigation analysis with safety recommendations
         """
-        analysis = asyncio.run(self.analyze_image(image))
+        analysis = self._run_sync(self.analyze_image(image))
         
         # Extract navigation-relevant information
         objects = analysis.get("objects", [])
@@ -51,7 +51,7 @@ class Settings(BaseSettings):
     tello_video_port: int = Field(11111, env="TELLO_VIDEO_PORT")
     
     class Config:
-        env_file = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), ".env")
+        env_file = str(env_path)
         case_sensitive = False
 
 
@@ -3,7 +3,9 @@ Simple Tello SDK wrapper using djitellopy for reliable drone operations.
 This provides a clean interface while leveraging the mature djitellopy library.
 """
 
+import functools
 import logging
+import math
 import cv2
 import numpy as np
 import threading
@@ -11,12 +13,24 @@ import time
 from typing import Optional, Callable
 try:
     from djitellopy import Tello
-except ImportError:
-    print("djitellopy not found. Installing...")
-    import subprocess
-    import sys
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "djitellopy"])
-    from djitellopy import Tello
+except ImportError as e:
+    # Fail fast instead of spawning pip at import time; callers fall back to their mock drones
+    raise ImportError("djitellopy not found. Install it with: pip install djitellopy") from e
+
+
+@functools.lru_cache(maxsize=64)
+def _arc_points(radius: int, angle: int) -> tuple:
+    """Waypoint and end point (x1, y1, x2, y2) of a rightward arc; the left arc mirrors x."""
+    angle_rad = math.radians(angle)
+    
+    # Waypoint (middle of arc)
+    x1 = int(radius * math.sin(angle_rad / 2))
+    y1 = int(radius * (1 - math.cos(angle_rad / 2)))
+    
+    # Final point (end of arc)
+    x2 = int(radius * math.sin(angle_rad))
+    y2 = int(radius * (1 - math.cos(angle_rad)))
+    return x1, y1, x2, y2
 
 
 class SimpleTello:
@@ -272,20 +286,9 @@ class SimpleTello:
         """
         try:
             # Calculate curve points for a right arc
-            import math
-            angle_rad = math.radians(angle)
-            
-            # Waypoint (middle of arc)
-            x1 = int(radius * math.sin(angle_rad / 2))
-            y1 = int(radius * (1 - math.cos(angle_rad / 2)))
-            z1 = 0
-            
-            # Final point (end of arc)
-            x2 = int(radius * math.sin(angle_rad))
-            y2 = int(radius * (1 - math.cos(angle_rad)))
-            z2 = 0
+            x1, y1, x2, y2 = _arc_points(radius, angle)
             
-            return self.curve_xyz_speed(x1, y1, z1, x2, y2, z2, speed)
+            return self.curve_xyz_speed(x1, y1, 0, x2, y2, 0, speed)
         except Exception as e:
             self.logger.error(f"Right arc curve error: {e}")
             return False
@@ -303,20 +306,9 @@ class SimpleTello:
         """
         try:
             # Calculate curve points for a left arc (mirror of right arc)
-            import math
-            angle_rad = math.radians(angle)
-            
-            # Waypoint (middle of arc)
-            x1 = int(-radius * math.sin(angle_rad / 2))
-            y1 = int(radius * (1 - math.cos(angle_rad / 2)))
-            z1 = 0
+            x1, y1, x2, y2 = _arc_points(radius, angle)
             
-            # Final point (end of arc)
-            x2 = int(-radius * math.sin(angle_rad))
-            y2 = int(radius * (1 - math.cos(angle_rad)))
-            z2 = 0
-            
-            return self.curve_xyz_speed(x1, y1, z1, x2, y2, z2, speed)
+            return self.curve_xyz_speed(-x1, y1, 0, -x2, y2, 0, speed)
         except Exception as e:
             self.logger.error(f"Left arc curve error: {e}")
             return False
@@ -0,0 +1 @@
+# Shared Utilities Package
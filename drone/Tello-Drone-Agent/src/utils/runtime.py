@@ -0,0 +1,40 @@
+"""
+Runtime helpers shared by the agent entry points.
+"""
+
+import asyncio
+import atexit
+import logging
+import logging.handlers
+import queue
+
+try:
+    import uvloop
+except ImportError:
+    # uvloop is optional (and unavailable on Windows) - fall back to the stock event loop
+    uvloop = None
+
+
+def setup_queue_logging(level: int = logging.INFO):
+    """Route root logging through a queue so stderr writes happen on a listener thread, not the event loop."""
+    log_queue = queue.Queue(-1)
+    
+    # The listener's handler owns the output format; the queue side only merges args (and tracebacks) into the message
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    # force=True drops any handler an imported module already installed on the root logger
+    logging.basicConfig(level=level, handlers=[queue_handler], force=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+def run(main):
+    """Run a coroutine to completion on uvloop when installed, else on the stock asyncio loop."""
+    if uvloop is not None:
+        return uvloop.run(main)
+    return asyncio.run(main)
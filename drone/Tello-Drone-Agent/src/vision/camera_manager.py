@@ -8,6 +8,7 @@ import numpy as np
 import asyncio
 import threading
 import logging
+import time
 from typing import Optional, Callable
 from drone.simple_tello import SimpleTello
 from PIL import Image
@@ -23,6 +24,13 @@ class CameraManager:
         self.capture_thread = None
         self.logger = logging.getLogger(__name__)
         
+        # Event loop that owns frame_callback; capture threads schedule onto it
+        self.loop = None
+        self._pending_callback = None
+        
+        # Newest frame from the capture thread; each new frame replaces the last so readers never see a backlog
+        self.latest_frame = None
+        
         # Camera objects
         self.webcam = None
         self.tello = None
@@ -37,15 +45,19 @@ class CameraManager:
         try:
             self.logger.info(f"Starting camera with source: {self.source}")
             
+            # Capture the loop once, and mark running before the capture thread checks the flag
+            self.loop = asyncio.get_running_loop()
+            self.running = True
+            
             if self.source == "tello":
                 await self._start_tello_camera()
             else:
                 await self._start_webcam()
                 
-            self.running = True
             self.logger.info("Camera started successfully")
             
         except Exception as e:
+            self.running = False
             self.logger.error(f"Failed to start camera: {e}")
             raise
 
@@ -108,6 +120,9 @@ class CameraManager:
             self.webcam.set(cv2.CAP_PROP_FRAME_WIDTH, self.frame_width)
             self.webcam.set(cv2.CAP_PROP_FRAME_HEIGHT, self.frame_height)
             
+            # Keep only one buffered frame so reads return the live image rather than a stale queue
+            self.webcam.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            
             self.logger.info("✅ Webcam started successfully")
             
             # Start capture thread
@@ -139,27 +154,13 @@ class CameraManager:
                     
                     # Convert to PIL Image
                     pil_image = Image.fromarray(frame)
+                    self.latest_frame = pil_image
                     
                     # Call frame callback if provided
                     if self.frame_callback:
-                        try:
-                            # Create a new event loop for this thread if needed
-                            import asyncio
-                            try:
-                                loop = asyncio.get_event_loop()
-                            except RuntimeError:
-                                # No event loop in this thread, create one
-                                loop = asyncio.new_event_loop()
-                                asyncio.set_event_loop(loop)
-                            
-                            # Run the callback
-                            loop.run_until_complete(self.frame_callback(pil_image))
-                            
-                        except Exception as e:
-                            self.logger.error(f"Error in frame callback: {e}")
+                        self._dispatch_frame(pil_image)
             
                 # Small delay to prevent excessive CPU usage
-                import time
                 time.sleep(0.033)  # ~30 FPS
                 
             except Exception as e:
@@ -183,39 +184,45 @@ class CameraManager:
                         
                         # Convert to PIL Image
                         pil_image = Image.fromarray(rgb_frame)
+                        self.latest_frame = pil_image
                         
                         # Call frame callback if provided
                         if self.frame_callback:
-                            try:
-                                # Get or create event loop
-                                try:
-                                    loop = asyncio.get_event_loop()
-                                    if loop.is_running():
-                                        asyncio.run_coroutine_threadsafe(
-                                            self.frame_callback(pil_image), loop
-                                        )
-                                    else:
-                                        asyncio.run(self.frame_callback(pil_image))
-                                except RuntimeError:
-                                    # No event loop in current thread, create one
-                                    asyncio.run(self.frame_callback(pil_image))
-                            except Exception as e:
-                                self.logger.error(f"Error in frame callback: {e}")
+                            self._dispatch_frame(pil_image)
                 
                 # Small delay to prevent excessive CPU usage
-                import time
                 time.sleep(0.033)  # ~30 FPS
                 
             except Exception as e:
                 self.logger.error(f"Error in webcam capture loop: {e}")
                 break
 
+    def _dispatch_frame(self, pil_image):
+        """Schedule frame_callback on the owning event loop, dropping frames while it is busy."""
+        try:
+            if self._pending_callback is None or self._pending_callback.done():
+                self._pending_callback = asyncio.run_coroutine_threadsafe(
+                    self.frame_callback(pil_image), self.loop
+                )
+                self._pending_callback.add_done_callback(self._log_callback_error)
+        except Exception as e:
+            self.logger.error(f"Error in frame callback: {e}")
+
+    def _log_callback_error(self, future):
+        """Log an exception raised by frame_callback, which would otherwise be lost with its future."""
+        if not future.cancelled() and future.exception() is not None:
+            self.logger.error(f"Error in frame callback: {future.exception()}")
+
     def capture_single_frame(self):
         """Capture a single frame (for testing)."""
         try:
+            # While the capture thread runs, reuse its newest frame instead of reading the device concurrently
+            if self.running and self.latest_frame is not None:
+                return self.latest_frame
+            
             if self.source == "tello" and self.tello:
                 # Use existing frame reader if available
-                if hasattr(self, 'tello_frame_reader') and self.tello_frame_reader and self.tello_frame_reader.frame is not None:
+                if self.tello_frame_reader and self.tello_frame_reader.frame is not None:
                     return Image.fromarray(self.tello_frame_reader.frame)
                 else:
                     # Fallback: try to get a frame reader, but be careful not to create conflicts
@@ -242,6 +249,7 @@ class CameraManager:
         """Stop the camera capture."""
         self.logger.info("Stopping camera...")
         self.running = False
+        self.latest_frame = None
         
         # Wait for capture thread to finish
         if self.capture_thread and self.capture_thread.is_alive():
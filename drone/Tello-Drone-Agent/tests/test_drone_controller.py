@@ -0,0 +1,202 @@
+"""
+Tests for the DroneController used by the realtime agents.
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+import sys
+import os
+from types import SimpleNamespace
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from drone_controller import DroneController
+
+
+class MockDrone:
+    """Drone stand-in whose commands block briefly and record how many overlap."""
+    
+    def __init__(self, result=True, delay=0.05):
+        self.result = result
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+    
+    def _command(self, name, *args):
+        with self._lock:
+            self.calls.append(name)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+    
+    def takeoff(self): return self._command("takeoff")
+    def land(self): return self._command("land")
+    def move_forward(self, distance): return self._command("move_forward", distance)
+    def emergency(self): return self._command("emergency")
+    def get_height(self): return 80
+    def get_battery(self): return 90
+
+
+def make_state(is_flying=False):
+    """Build a minimal drone state with the fields DroneController uses."""
+    return SimpleNamespace(is_flying=is_flying, height=0, battery=100, movement_count=0)
+
+
+class TestCurveValidation(unittest.TestCase):
+    """Test local validation of Tello curve limits."""
+    
+    def setUp(self):
+        self.controller = DroneController(drone=None, drone_state=None)
+    
+    def test_valid_curves(self):
+        """Test curves inside the Tello limits are accepted."""
+        # 60cm radius semicircle and 100cm radius arc (the tool schema examples)
+        self.assertIsNone(self.controller._validate_curve(60, 60, 0, 120, 0, 0, 30))
+        self.assertIsNone(self.controller._validate_curve(40, 80, 0, 0, 160, 0, 25))
+        # Speed limits are inclusive
+        self.assertIsNone(self.controller._validate_curve(60, 60, 0, 120, 0, 0, 10))
+        self.assertIsNone(self.controller._validate_curve(60, 60, 0, 120, 0, 0, 60))
+    
+    def test_speed_out_of_range(self):
+        """Test curve speed outside 10-60cm/s is rejected."""
+        self.assertIn("speed", self.controller._validate_curve(60, 60, 0, 120, 0, 0, 9))
+        self.assertIn("speed", self.controller._validate_curve(60, 60, 0, 120, 0, 0, 61))
+    
+    def test_point_too_close(self):
+        """Test points within 20cm of the current position on every axis are rejected."""
+        self.assertIn("20cm", self.controller._validate_curve(10, 10, 0, 120, 0, 0, 30))
+        self.assertIn("20cm", self.controller._validate_curve(60, 60, 0, 19, -19, 19, 30))
+    
+    def test_coordinate_out_of_range(self):
+        """Test coordinates outside the Tello -500 to 500cm range are rejected."""
+        self.assertIsNone(self.controller._validate_curve(300, 0, 0, 0, 300, 0, 30))
+        self.assertIn("-500 to 500", self.controller._validate_curve(501, 0, 0, 0, 300, 0, 30))
+        self.assertIn("-500 to 500", self.controller._validate_curve(300, 0, 0, 0, 300, -501, 30))
+    
+    def test_straight_line(self):
+        """Test collinear points are rejected."""
+        self.assertIn("straight line", self.controller._validate_curve(20, 0, 0, 40, 0, 0, 30))
+    
+    def test_radius_out_of_range(self):
+        """Test curves with a radius outside 50-1000cm are rejected."""
+        # ~18cm radius
+        self.assertIn("radius", self.controller._validate_curve(20, 0, 0, 20, 30, 0, 30))
+        # Nearly straight points give a ~10000cm radius
+        self.assertIn("radius", self.controller._validate_curve(100, 0, 0, 200, 1, 0, 30))
+
+
+class TestCommandSerialization(unittest.IsolatedAsyncioTestCase):
+    """Test that concurrent commands never reach the drone at the same time."""
+    
+    async def test_concurrent_moves_do_not_overlap(self):
+        """Test two concurrent moves run one after the other."""
+        drone = MockDrone()
+        controller = DroneController(drone, make_state(is_flying=True))
+        
+        await asyncio.gather(controller.move_forward(50), controller.move_forward(50))
+        
+        self.assertEqual(drone.calls, ["move_forward", "move_forward"])
+        self.assertEqual(drone.max_active, 1)
+    
+    async def test_concurrent_takeoffs_take_off_once(self):
+        """Test the is_flying guard holds when two takeoffs race."""
+        drone = MockDrone()
+        controller = DroneController(drone, make_state())
+        
+        results = await asyncio.gather(controller.takeoff(), controller.takeoff())
+        
+        self.assertEqual(drone.calls, ["takeoff"])
+        self.assertIn("Drone is already flying!", results)
+
+
+class TestFleetCommands(unittest.IsolatedAsyncioTestCase):
+    """Test fan-out of commands to a fleet of drones."""
+    
+    def test_fanout_summary(self):
+        """Test the summary counts successes and lists per-drone errors."""
+        controller = DroneController(MockDrone(), make_state())
+        
+        self.assertEqual(
+            controller._fanout_summary("Fleet takeoff", [True, True]),
+            "Fleet takeoff: 2/2 drones succeeded"
+        )
+        self.assertEqual(
+            controller._fanout_summary("Fleet takeoff", [True, False, RuntimeError("no ack")]),
+            "Fleet takeoff: 1/3 drones succeeded (#3: no ack)"
+        )
+    
+    def test_primary_drone_leads_fleet(self):
+        """Test the primary drone is always the first fleet member, once."""
+        primary, wingman = MockDrone(), MockDrone()
+        
+        self.assertEqual(DroneController(primary, make_state()).drones, [primary])
+        self.assertEqual(DroneController(primary, make_state(), drones=[wingman, primary]).drones, [primary, wingman])
+    
+    async def test_fanout_runs_concurrently(self):
+        """Test every drone receives the command and the calls overlap."""
+        drones = [MockDrone(delay=0.1) for _ in range(3)]
+        controller = DroneController(drones[0], make_state(), drones=drones)
+        
+        start = time.monotonic()
+        results = await controller._fanout("takeoff")
+        
+        self.assertEqual(results, [True, True, True])
+        self.assertLess(time.monotonic() - start, 0.25)
+        self.assertTrue(all(drone.calls == ["takeoff"] for drone in drones))
+    
+    async def test_broadcast_takeoff_updates_state(self):
+        """Test a fleet takeoff marks the primary drone as flying so single-drone commands work."""
+        primary, wingman = MockDrone(), MockDrone(result=RuntimeError("no ack"))
+        state = make_state()
+        controller = DroneController(primary, state, drones=[wingman])
+        
+        result = await controller.broadcast_takeoff()
+        
+        self.assertEqual(result, "Fleet takeoff: 1/2 drones succeeded (#2: no ack)")
+        self.assertTrue(state.is_flying)
+        self.assertEqual(state.height, 80)
+        self.assertIn("Moved forward", await controller.move_forward(50))
+    
+    async def test_broadcast_land_updates_state(self):
+        """Test a fleet landing marks the primary drone as on the ground."""
+        state = make_state(is_flying=True)
+        controller = DroneController(MockDrone(), state, drones=[MockDrone()])
+        
+        self.assertEqual(await controller.broadcast_land(), "Fleet landing: 2/2 drones succeeded")
+        self.assertFalse(state.is_flying)
+        self.assertEqual(await controller.land(), "Drone is already on the ground!")
+    
+    async def test_broadcast_guards(self):
+        """Test fleet commands apply the same flight-state guards as single-drone commands."""
+        drone = MockDrone()
+        controller = DroneController(drone, make_state(), drones=[MockDrone()])
+        
+        self.assertEqual(await controller.broadcast_move_forward(50), "Cannot move - drone is not flying! Use takeoff first.")
+        self.assertEqual(await controller.broadcast_land(), "Drone is already on the ground!")
+        self.assertEqual(drone.calls, [])
+    
+    async def test_broadcast_vision_only(self):
+        """Test fleet commands only simulate in vision-only mode."""
+        drone = MockDrone()
+        state = make_state()
+        controller = DroneController(drone, state, vision_only=True)
+        
+        await controller.broadcast_takeoff()
+        self.assertIn("simulation mode", await controller.broadcast_move_forward(50))
+        self.assertTrue(state.is_flying)
+        self.assertEqual(state.movement_count, 1)
+        self.assertEqual(drone.calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
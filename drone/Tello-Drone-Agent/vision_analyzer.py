@@ -5,8 +5,8 @@ Handles GPT-4o vision analysis with focus-specific prompts and image processing.
 """
 
 import asyncio
-import json
 import base64
+import itertools
 import logging
 import os
 import time
@@ -15,6 +15,28 @@ from typing import Dict, Any, Optional
 import cv2
 import numpy as np
 
+from frame_encoder import encode_jpeg
+from json_codec import json_dumps
+
+# Suffix for images/drone_capture_* files; the epoch-second timestamp alone repeats on rapid captures
+_capture_counter = itertools.count()
+
+# Focus-specific prompts for different analysis types
+FOCUS_PROMPTS = {
+    "obstacles": "Analyze this drone camera view for navigation safety. Identify any obstacles, walls, or hazards that could interfere with drone movement. Provide specific distances if possible and suggest safe movement directions.",
+    "objects": "Describe all objects, furniture, and items visible in this drone camera view. Focus on identifying what's in the scene and their approximate positions relative to the drone.",
+    "navigation": "Evaluate this view for drone navigation. Assess the available space, lighting conditions, ceiling height, and provide recommendations for safe flight paths.",
+    "landing_spot": "Analyze the area below and around the drone for suitable landing spots. Identify flat surfaces, potential hazards, and recommend the best landing approach."
+}
+
+# Simulation responses for vision-only mode
+SIMULATION_ANALYSES = {
+    "obstacles": "No Objects for upto 1.5 meters",
+    "objects": "No Objects for upto 1.5 meters",
+    "navigation": "No Objects for upto 1.5 meters",
+    "landing_spot": "No Objects for upto 1.5 meters"
+}
+
 
 class VisionAnalyzer:
     """Handles image capture, analysis, and GPT-4o vision integration."""
@@ -23,21 +45,9 @@ class VisionAnalyzer:
         self.logger = logging.getLogger(f"{__name__}.VisionAnalyzer")
         self.websocket = websocket
         
-        # Focus-specific prompts for different analysis types
-        self.focus_prompts = {
-            "obstacles": "Analyze this drone camera view for navigation safety. Identify any obstacles, walls, or hazards that could interfere with drone movement. Provide specific distances if possible and suggest safe movement directions.",
-            "objects": "Describe all objects, furniture, and items visible in this drone camera view. Focus on identifying what's in the scene and their approximate positions relative to the drone.",
-            "navigation": "Evaluate this view for drone navigation. Assess the available space, lighting conditions, ceiling height, and provide recommendations for safe flight paths.",
-            "landing_spot": "Analyze the area below and around the drone for suitable landing spots. Identify flat surfaces, potential hazards, and recommend the best landing approach."
-        }
-        
-        # Simulation responses for vision-only mode
-        self.simulation_analyses = {
-            "obstacles": "No Objects for upto 1.5 meters",
-            "objects": "No Objects for upto 1.5 meters",
-            "navigation": "No Objects for upto 1.5 meters",
-            "landing_spot": "No Objects for upto 1.5 meters"
-        }
+        # Per-instance copies so add_custom_focus doesn't change the module defaults
+        self.focus_prompts = dict(FOCUS_PROMPTS)
+        self.simulation_analyses = dict(SIMULATION_ANALYSES)
     
     def set_websocket(self, websocket):
         """Update the WebSocket connection for real analysis."""
@@ -91,14 +101,10 @@ class VisionAnalyzer:
         return self.simulation_analyses.get(focus, "Image captured and analyzed - environment looks good.")
     
     def _frame_to_base64(self, frame: np.ndarray, quality: int = 80) -> str:
-        """Convert OpenCV frame to base64 string for API (BGR -> RGB conversion)."""
+        """Convert a drone camera frame (RGB order) to a base64 JPEG string for the API."""
         try:
-            # Convert BGR (OpenCV) to RGB (what most vision APIs expect)
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            # Encode as JPEG
-            _, buffer = cv2.imencode('.jpg', frame_rgb, [cv2.IMWRITE_JPEG_QUALITY, quality])
-            return base64.b64encode(buffer).decode('utf-8')
+            # The channel order is handled inside the encoder (libjpeg-turbo when available)
+            return base64.b64encode(encode_jpeg(frame, quality=quality, rgb=True)).decode('utf-8')
         except Exception as e:
             self.logger.error(f"❌ Frame encoding error: {e}")
             raise
@@ -108,7 +114,7 @@ class VisionAnalyzer:
         def save_image():
             try:
                 timestamp = int(time.time())
-                image_path = f"images/drone_capture_{focus}_{timestamp}.jpg"
+                image_path = f"images/drone_capture_{focus}_{timestamp}_{next(_capture_counter)}.jpg"
                 os.makedirs("images", exist_ok=True)
                 
                 # Debug: Log frame info
@@ -152,7 +158,7 @@ class VisionAnalyzer:
                 }
             }
             
-            await self.websocket.send(json.dumps(image_message))
+            await self.websocket.send(json_dumps(image_message))
             
             # Request a response with audio modality so the user hears the analysis
             response_request = {
@@ -163,7 +169,7 @@ class VisionAnalyzer:
                 }
             }
             
-            await self.websocket.send(json.dumps(response_request))
+            await self.websocket.send(json_dumps(response_request))
             
             # Return a message that indicates the response is already being handled
             # Use a special prefix to signal no additional speech response needed
@@ -4,6 +4,7 @@ Provides speech input, image input, speech output, drone control, and web UI via
 """
 
 import asyncio
+import concurrent.futures
 import json
 import base64
 import logging
@@ -33,6 +34,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 # Import vision analyzer and drone controller
 from vision_analyzer import VisionAnalyzer
 from drone_controller import DroneController
+from frame_encoder import encode_jpeg, STREAM_SIZE
+from json_codec import json_dumps, json_loads
+from utils.runtime import run as run_async, setup_queue_logging
 
 # Use our own settings class that reads from environment variables
 class EnvironmentSettings:
@@ -43,8 +47,20 @@ class EnvironmentSettings:
 
 settings = EnvironmentSettings()
 
+# (epoch second, formatted "%H:%M:%S") of the last log timestamp handed out
+_log_ts_cache = (None, "")
+
+def _log_timestamp() -> str:
+    """Return the current wall-clock time as HH:MM:SS, formatted at most once per second."""
+    global _log_ts_cache
+    now = int(time.time())
+    if now != _log_ts_cache[0]:
+        _log_ts_cache = (now, time.strftime('%H:%M:%S', time.localtime(now)))
+    return _log_ts_cache[1]
+
 try:
-    from src.drone.simple_tello import SimpleTello
+    # Same dotted name as the rest of the codebase so the module is imported (and cached) once
+    from drone.simple_tello import SimpleTello
 except ImportError:
     # Mock SimpleTello for testing when real drone module isn't available
     class SimpleTello:
@@ -69,10 +85,16 @@ except ImportError:
         def streamoff(self): pass
         def end(self): pass
 
-logging.basicConfig(level=logging.INFO)
+setup_queue_logging()
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Realtime API messages serialized once instead of per send.
+# Base64 never needs JSON escaping, so audio chunks are spliced into a fixed prefix.
+RESPONSE_CREATE_MESSAGE = json.dumps({"type": "response.create"})
+AUDIO_APPEND_PREFIX = '{"type": "input_audio_buffer.append", "audio": "'
+AUDIO_APPEND_SUFFIX = '"}'
+
+@dataclass(slots=True)
 class DroneState:
     """Track drone state and flight history."""
     is_flying: bool = False
@@ -86,6 +108,217 @@ class DroneState:
         if self.obstacles_detected is None:
             self.obstacles_detected = []
 
+# Single-parameter motion tools exposed to the realtime model:
+# (name, description, parameter, parameter description, minimum, maximum)
+MOTION_TOOL_SPECS = (
+    ("move_forward", "Move drone forward by specified distance", "distance", "Distance in centimeters (5-100cm recommended)", 5, 300),
+    ("move_backward", "Move drone backward by specified distance", "distance", "Distance in centimeters (5-100cm)", 5, 100),
+    ("move_left", "Move drone left by specified distance", "distance", "Distance in centimeters (5-100cm)", 5, 100),
+    ("move_right", "Move drone right by specified distance", "distance", "Distance in centimeters (5-100cm)", 5, 100),
+    ("move_up", "Move drone up by specified distance", "distance", "Distance in centimeters (20-80cm recommended)", 20, 100),
+    ("move_down", "Move drone down by specified distance", "distance", "Distance in centimeters (20-80cm recommended)", 20, 100),
+    ("rotate_clockwise", "Rotate drone clockwise by specified angle", "angle", "Rotation angle in degrees (30-180°)", 30, 180),
+    ("rotate_counter_clockwise", "Rotate drone counter-clockwise by specified angle", "angle", "Rotation angle in degrees (30-180°)", 30, 180),
+)
+
+def _motion_tool(name: str, description: str, param: str, param_description: str,
+                 minimum: int, maximum: int) -> Dict[str, Any]:
+    """Build a realtime tool schema for a single integer-parameter motion command."""
+    return {
+        "type": "function",
+        "name": name,
+        "description": description,
+        "parameters": {
+            "type": "object",
+            "properties": {
+                param: {
+                    "type": "integer",
+                    "description": param_description,
+                    "minimum": minimum,
+                    "maximum": maximum
+                }
+            },
+            "required": [param]
+        }
+    }
+
+# The realtime session configuration is static, so it is serialized once at import
+SESSION_UPDATE_MESSAGE = json.dumps({
+    "type": "session.update",
+    "session": {
+        "modalities": ["text", "audio"],  # Vision is handled separately
+        "instructions": """You are an intelligent real-time drone controller assistant. You can do simple movements or complex maneuvers by moving in multiple steps
+
+🚁 EXECUTION STYLE:
+- WHen given complex tasks, you break them into smaller tasks and execute continuously. 
+- If asked go in a circle of 100cm, you break circle into smaller waypoints, calculate where to move and execute each step without pausing untill you complete circle
+- Execute multi-step commands smoothly: "move forward 50cm then turn right and go forward 50cm again" should flow naturally without any stop in between
+- Don't ask for confirmation or stop between steps
+- Full 360 rotation is allowed, no need to pause or complete in smaller steps
+- When asked to move while captuing, capture images every 1 sec and check for obstacles before moving next step 
+
+🎙️ COMMUNICATION:
+- Give brief status updates only when asked
+- Dont announce any result of any operations or movements performed unless i ask for status
+- Be conversational but efficient and as short as possible
+
+
+🚁 DRONE CONTROL:
+- Take off and land the drone safely
+- Move the drone in all directions (forward, backward, up, down, left, right, curve ) 
+- Rotate the drone clockwise and counter-clockwise  
+- Get real-time drone status (battery, height, flight state)
+- Capture and analyze live camera images from the drone
+""",
+
+        "voice": "alloy",
+        "input_audio_format": "pcm16",
+        "output_audio_format": "pcm16",
+        "input_audio_transcription": {
+            "model": "whisper-1"
+        },
+        "turn_detection": {
+            "type": "server_vad",
+            "threshold": 0.5,
+            "prefix_padding_ms": 300,
+            "silence_duration_ms": 500
+        },
+        "tools": [
+            {
+                "type": "function",
+                "name": "takeoff",
+                "description": "Take off the drone safely - only use when drone is on ground",
+                "parameters": {"type": "object", "properties": {}}
+            },
+            {
+                "type": "function",
+                "name": "land", 
+                "description": "Land the drone safely at current location",
+                "parameters": {"type": "object", "properties": {}}
+            },
+            *(_motion_tool(*spec) for spec in MOTION_TOOL_SPECS),
+            {
+                "type": "function",
+                "name": "get_drone_status",
+                "description": "Get current drone status including battery, height, and flight state",
+                "parameters": {"type": "object", "properties": {}}
+            },
+            {
+                "type": "function",
+                "name": "capture_and_analyze_image",
+                "description": "Capture current camera view and provide description of what the drone sees",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "focus": {
+                            "type": "string",
+                            "description": "What to focus on: obstacles, objects, navigation, landing_spot",
+                            "enum": ["obstacles", "objects", "navigation", "landing_spot"]
+                        }
+                    },
+                    "required": ["focus"]
+                }
+            },
+            {
+                "type": "function",
+                "name": "curve_xyz_speed",
+                "description": "Fly in a curve from current position to specified coordinates with speed control. Tello requires: (1) each waypoint must be at least ~20 cm away from the current position, (2) the curve radius must be between 50 cm and 1000 cm, and (3) the flight speed must be between 10–60 cm/s. Curves that break these limits are rejected before reaching the drone, so pick points that trace a wide arc (for example a 60 cm radius: waypoint (60, 60, 0), destination (120, 0, 0)); three nearly straight points give a huge radius and tiny offsets give a tiny one.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                    "x1": {
+                        "type": "integer",
+                        "description": "First waypoint X coordinate in cm, relative to the current position (-500 to 500). At least one of x1/y1/z1 must be 20 cm or more in magnitude.",
+                        "minimum": -500,
+                        "maximum": 500
+                    },
+                    "y1": {
+                        "type": "integer",
+                        "description": "First waypoint Y coordinate in cm, relative to the current position (-500 to 500). At least one of x1/y1/z1 must be 20 cm or more in magnitude.",
+                        "minimum": -500,
+                        "maximum": 500
+                    },
+                    "z1": {
+                        "type": "integer",
+                        "description": "First waypoint Z coordinate in cm, relative to the current position (-500 to 500). At least one of x1/y1/z1 must be 20 cm or more in magnitude.",
+                        "minimum": -500,
+                        "maximum": 500
+                    },
+                    "x2": {
+                        "type": "integer",
+                        "description": "Destination X coordinate in cm, relative to the current position (-500 to 500). At least one of x2/y2/z2 must be 20 cm or more in magnitude.",
+                        "minimum": -500,
+                        "maximum": 500
+                    },
+                    "y2": {
+                        "type": "integer",
+                        "description": "Destination Y coordinate in cm, relative to the current position (-500 to 500). At least one of x2/y2/z2 must be 20 cm or more in magnitude.",
+                        "minimum": -500,
+                        "maximum": 500
+                    },
+                    "z2": {
+                        "type": "integer",
+                        "description": "Destination Z coordinate in cm, relative to the current position (-500 to 500). At least one of x2/y2/z2 must be 20 cm or more in magnitude.",
+                        "minimum": -500,
+                        "maximum": 500
+                    },
+                    "speed": {
+                        "type": "integer",
+                        "description": "Flight speed in cm/s (allowed range: 10–60).",
+                        "minimum": 10,
+                        "maximum": 60
+                    }
+                    },
+                    "required": ["x1", "y1", "z1", "x2", "y2", "z2", "speed"],
+                    "examples": [
+                        { "x1": 60, "y1": 60, "z1": 0, "x2": 120, "y2": 0, "z2": 0, "speed": 30 },
+                        { "x1": 40, "y1": 80, "z1": 0, "x2": 0, "y2": 160, "z2": 0, "speed": 25 }
+                    ]
+                }
+            },
+            {
+                "type": "function",
+                "name": "go_xyz_speed",
+                "description": "Fly directly to specified coordinates relative to current position with speed control",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "x": {
+                            "type": "integer",
+                            "description": "X coordinate in cm (-30 to 30, positive=right)",
+                            "minimum": -30,
+                            "maximum": 30
+                        },
+                        "y": {
+                            "type": "integer",
+                            "description": "Y coordinate in cm (-30 to 30, positive=forward)",
+                            "minimum": -30,
+                            "maximum": 30
+                        },
+                        "z": {
+                            "type": "integer",
+                            "description": "Z coordinate in cm (-30 to 30, positive=up)",
+                            "minimum": -30,
+                            "maximum": 30
+                        },
+                        "speed": {
+                            "type": "integer",
+                            "description": "Flight speed in cm/s (10-100)",
+                            "minimum": 10,
+                            "maximum": 100
+                        }
+                    },
+                    "required": ["x", "y", "z", "speed"]
+                }
+            }
+        ],
+        "tool_choice": "auto",
+        "temperature": 0.7,
+        "max_response_output_tokens": 4096
+    }
+})
+
+
 class WebEnabledDroneAgent:
     """Real-time speech and vision drone controller with web UI support."""
     
@@ -114,15 +347,33 @@ class WebEnabledDroneAgent:
         self.realtime_websocket = None
         self.is_realtime_connected = False
         
+        # Response state tracking - the API rejects response.create while a response is active,
+        # so a continuation requested mid-response is sent once response.done arrives
+        self.response_active = False
+        self._continuation_pending = False
+        
         # Web UI WebSocket server
         self.sio = None
         self.web_app = None
         self.web_runner = None
         self.web_clients = set()
         
-        # Audio queues
-        self.input_audio_queue = queue.Queue()
+        # Log entries waiting for the next batched broadcast
+        self._pending_logs = []
+        self._log_flush_task = None
+        self.log_flush_interval = 0.1  # Flush batched logs every 100ms
+        
+        # Last status broadcast to web clients, used to send only changed fields
+        self._last_status = {}
+        self._status_flush_handle = None
+        self.status_coalesce_window = 0.005  # Merge status requests within 5ms into one broadcast
+        self._status_broadcast_tasks = set()  # Strong refs so in-flight broadcasts aren't garbage-collected
+        
+        # Audio queues - microphone chunks are handed to the event loop via call_soon_threadsafe
+        # Bounded to ~4s of audio (100 x 1024 samples @ 24kHz) so a stalled sender can't grow it forever
+        self.input_audio_queue = asyncio.Queue(maxsize=100)
         self.output_audio_queue = queue.Queue()
+        self.loop = None
         
         # Control flags
         self.recording = False
@@ -148,6 +399,13 @@ class WebEnabledDroneAgent:
         self.video_streaming = False
         self.video_streaming_enabled = False  # Video streaming off by default
         
+        # Latest encoded frame shared by all MJPEG viewers (single producer)
+        self._latest_frame_jpeg = None
+        self._frame_event = asyncio.Event()
+        self._video_viewers = set()
+        self.video_thread = None
+        self.audio_input_thread = None
+        
     def _register_drone_functions(self):
         """Register drone control functions."""
         
@@ -193,14 +451,17 @@ class WebEnabledDroneAgent:
             )
         })
         
+        # MJPEG video stream consumed directly by the web UI <img> element
+        self.web_app.router.add_get('/video.mjpg', self._mjpeg_handler)
+        
         # Socket.IO event handlers
         @self.sio.event
         async def connect(sid, environ):
             self.web_clients.add(sid)
             self.logger.info(f"🌐 Web client connected: {sid}")
             
-            # Send current drone status
-            await self.broadcast_drone_status()
+            # Send full drone status snapshot; later updates arrive as deltas
+            await self.sio.emit('drone_status', self._status_snapshot(), room=sid)
             
             # Video streaming is now controlled by user toggle, not auto-started
         
@@ -220,19 +481,22 @@ class WebEnabledDroneAgent:
                 command = data.get('command')
                 params = data.get('params', {})
                 
-                self.logger.info(f"🌐 Web command: {command} with params: {params}")
+                self.logger.info("🌐 Web command: %s with params: %s", command, params)
                 
                 # Execute the command
-                if command in self.functions:
-                    result = await self.functions[command](**params)
-                    await self.sio.emit('log', {
-                        'message': f"✅ {command}: {result}",
-                        'level': 'success',
-                        'timestamp': time.strftime('%H:%M:%S')
-                    }, room=sid)
+                func = self.functions.get(command)
+                if func is not None:
+                    result = await func(**params)
                     
-                    # Send updated drone status
-                    await self.broadcast_drone_status()
+                    # Reply to the caller and push updated drone status to everyone concurrently
+                    await asyncio.gather(
+                        self.sio.emit('log', {
+                            'message': f"✅ {command}: {result}",
+                            'level': 'success',
+                            'timestamp': _log_timestamp()
+                        }, room=sid),
+                        self.broadcast_drone_status()
+                    )
                     
                     # Signal command completion
                     await self.sio.emit('command_complete', {'command': command, 'result': result}, room=sid)
@@ -241,7 +505,7 @@ class WebEnabledDroneAgent:
                     await self.sio.emit('log', {
                         'message': f"❌ {error_msg}",
                         'level': 'error',
-                        'timestamp': time.strftime('%H:%M:%S')
+                        'timestamp': _log_timestamp()
                     }, room=sid)
                     
             except Exception as e:
@@ -250,7 +514,7 @@ class WebEnabledDroneAgent:
                 await self.sio.emit('log', {
                     'message': f"❌ {error_msg}",
                     'level': 'error',
-                    'timestamp': time.strftime('%H:%M:%S')
+                    'timestamp': _log_timestamp()
                 }, room=sid)
         
         @self.sio.event
@@ -266,7 +530,7 @@ class WebEnabledDroneAgent:
                 await self.sio.emit('log', {
                     'message': f"🎙️ Speech control {status}",
                     'level': 'info',
-                    'timestamp': time.strftime('%H:%M:%S')
+                    'timestamp': _log_timestamp()
                 }, room=sid)
                 
                 # Handle recording state based on speech enabled/disabled
@@ -280,8 +544,8 @@ class WebEnabledDroneAgent:
                     self.logger.info("🎙️ Restarted audio recording")
                     
                     # Start a new audio input worker thread if needed
-                    if self.input_stream and not any(t.name.startswith('_audio_input_worker') for t in threading.enumerate()):
-                        threading.Thread(target=self._audio_input_worker, daemon=True, name='_audio_input_worker_restart').start()
+                    if self.input_stream and not (self.audio_input_thread and self.audio_input_thread.is_alive()):
+                        self._start_audio_input_thread()
                         self.logger.info("🎙️ Restarted audio input worker")
                 
             except Exception as e:
@@ -290,7 +554,7 @@ class WebEnabledDroneAgent:
                 await self.sio.emit('log', {
                     'message': f"❌ {error_msg}",
                     'level': 'error',
-                    'timestamp': time.strftime('%H:%M:%S')
+                    'timestamp': _log_timestamp()
                 }, room=sid)
         
         @self.sio.event
@@ -303,30 +567,36 @@ class WebEnabledDroneAgent:
                 status = "enabled" if enabled else "disabled"
                 self.logger.info(f"📹 Video streaming {status} by web client {sid}")
                 
-                await self.sio.emit('log', {
-                    'message': f"📹 Video streaming {status}",
-                    'level': 'info',
-                    'timestamp': time.strftime('%H:%M:%S')
-                }, room=sid)
-                
-                # Handle video streaming state
+                # Handle video streaming state before the first await - the UI requests
+                # /video.mjpg as soon as it toggles, and the handler needs the producer running
                 if enabled and not self.video_streaming and self.web_clients:
                     # Start video streaming
                     self.video_streaming = True
-                    asyncio.create_task(self._video_stream_worker())
+                    await self._video_stream_worker()
                     self.logger.info("📹 Started video streaming")
                 elif not enabled and self.video_streaming:
                     # Stop video streaming
                     self.video_streaming = False
                     self.logger.info("📹 Stopped video streaming")
                 
+                if not enabled:
+                    # Drop the last frame so the next session doesn't open on a stale picture,
+                    # and wake MJPEG viewers so their responses end
+                    self._stop_video_viewers()
+                
+                await self.sio.emit('log', {
+                    'message': f"📹 Video streaming {status}",
+                    'level': 'info',
+                    'timestamp': _log_timestamp()
+                }, room=sid)
+                
             except Exception as e:
                 error_msg = f"Video toggle failed: {str(e)}"
                 self.logger.error(f"❌ {error_msg}")
                 await self.sio.emit('log', {
                     'message': f"❌ {error_msg}",
                     'level': 'error',
-                    'timestamp': time.strftime('%H:%M:%S')
+                    'timestamp': _log_timestamp()
                 }, room=sid)
         
         # Start web server
@@ -342,85 +612,202 @@ class WebEnabledDroneAgent:
         """Stream video frames to web clients at 30 FPS in separate thread."""
         def video_streaming_thread():
             """Thread function for video streaming to avoid blocking main event loop."""
-            while self.video_streaming and self.video_streaming_enabled and self.web_clients:
-                try:
-                    if not self.vision_only:
-                        # Get frame from drone camera
-                        frame = self.drone.get_frame()
-                        
-                        # Check if frame is valid
-                        if frame is None:
-                            time.sleep(0.033)  # Wait ~30ms before retry
-                            continue
-                        elif frame.size == 0:
+            # Pace frames against an absolute monotonic deadline so encode time doesn't drift the rate
+            frame_period = 1 / 30
+            next_frame_time = time.monotonic()
+            
+            try:
+                while self.video_streaming and self.video_streaming_enabled and self.web_clients:
+                    try:
+                        # Nobody is watching the MJPEG stream - skip capture and encoding
+                        if not self._video_viewers:
+                            time.sleep(0.1)
                             continue
+                    
+                        if not self.vision_only:
+                            # Get frame from drone camera
+                            frame = self.drone.get_frame()
+                        
+                            # Check if frame is valid
+                            if frame is None:
+                                time.sleep(0.033)  # Wait ~30ms before retry
+                                continue
+                            elif frame.size == 0:
+                                continue
+                            # Drone frames arrive in RGB order; the encoder handles the channel swap
+                            frame_is_rgb = True
                         else:
-                            # Convert BGR to RGB for correct color display
-                            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    else:
-                        # Create a mock frame for simulation
-                        frame = np.zeros((480, 640, 3), dtype=np.uint8)
-                        cv2.putText(frame, "SIMULATION MODE", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-                        cv2.putText(frame, f"Battery: {self.drone_state.battery}%", (50, 100), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-                        cv2.putText(frame, f"Height: {self.drone_state.height}cm", (50, 130), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-                        cv2.putText(frame, f"Flying: {self.drone_state.is_flying}", (50, 160), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+                            # Create a mock frame for simulation
+                            frame = np.zeros((480, 640, 3), dtype=np.uint8)
+                            cv2.putText(frame, "SIMULATION MODE", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                            cv2.putText(frame, f"Battery: {self.drone_state.battery}%", (50, 100), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+                            cv2.putText(frame, f"Height: {self.drone_state.height}cm", (50, 130), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+                            cv2.putText(frame, f"Flying: {self.drone_state.is_flying}", (50, 160), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+                            frame_is_rgb = False
                     
-                    if frame is not None and frame.size > 0:
-                        if len(frame.shape) == 3 and frame.shape[2] == 3:
-                            # Resize for better performance while maintaining quality
-                            frame = cv2.resize(frame, (640, 480))
+                        if frame is not None and frame.size > 0:
+                            if len(frame.shape) == 3 and frame.shape[2] == 3:
+                                # Resize (only if needed) and encode in one pass, good quality for clear video
+                                frame_bytes = encode_jpeg(frame, quality=80, rgb=frame_is_rgb, size=STREAM_SIZE)
                             
-                            # Use good quality for clear video
-                            encode_param = [cv2.IMWRITE_JPEG_QUALITY, 80]
-                            _, buffer = cv2.imencode('.jpg', frame, encode_param)
-                            frame_bytes = buffer.tobytes()
-                            
-                            # Send to all connected web clients using thread-safe call
-                            if self.web_clients and self.sio:
-                                asyncio.run_coroutine_threadsafe(
-                                    self.sio.emit('video_frame', frame_bytes),
-                                    self.loop
-                                )
+                                # Publish to MJPEG viewers with a plain callback - no Task/Future per frame
+                                self.loop.call_soon_threadsafe(self._publish_frame, frame_bytes)
                     
-                    # 30 FPS = 33.33ms delay
-                    time.sleep(1/30)
+                        # 30 FPS: sleep until the next deadline, skipping ahead if encoding fell behind
+                        next_frame_time = max(next_frame_time + frame_period, time.monotonic())
+                        time.sleep(max(0, next_frame_time - time.monotonic()))
                     
-                except Exception as e:
-                    self.logger.error(f"❌ Video streaming error: {e}")
-                    time.sleep(0.1)
+                    except Exception as e:
+                        self.logger.error(f"❌ Video streaming error: {e}")
+                        time.sleep(0.1)
+            finally:
+                # Viewers blocked on the next frame must notice the producer is gone
+                try:
+                    self.loop.call_soon_threadsafe(self._stop_video_viewers)
+                except RuntimeError:
+                    pass  # Event loop already closed during shutdown
+        
+        # Only ever run one producer; a quick off/on toggle reuses the running thread
+        if self.video_thread and self.video_thread.is_alive():
+            return
         
         # Store reference to event loop for thread-safe calls
-        self.loop = asyncio.get_event_loop()
+        self.loop = asyncio.get_running_loop()
         
         # Start video streaming in a separate thread to avoid blocking
-        import threading
         self.video_thread = threading.Thread(target=video_streaming_thread, daemon=True)
         self.video_thread.start()
     
+    def _publish_frame(self, frame_bytes: bytes):
+        """Store the latest encoded frame and wake all MJPEG viewers."""
+        self._latest_frame_jpeg = frame_bytes
+        self._wake_video_viewers()
+    
+    def _stop_video_viewers(self):
+        """Forget the last frame and wake all MJPEG viewers so they see the stream has stopped."""
+        self._latest_frame_jpeg = None
+        self._wake_video_viewers()
+    
+    def _wake_video_viewers(self):
+        """Release everyone waiting on the current frame event and arm a fresh one."""
+        event, self._frame_event = self._frame_event, asyncio.Event()
+        event.set()
+    
+    async def _mjpeg_handler(self, request):
+        """Serve the video stream as multipart/x-mixed-replace JPEG frames."""
+        response = web.StreamResponse(headers={
+            'Content-Type': 'multipart/x-mixed-replace; boundary=frame',
+            'Cache-Control': 'no-cache'
+        })
+        await response.prepare(request)
+        self._video_viewers.add(response)
+        
+        try:
+            # New viewers get the current snapshot right away instead of waiting for the next frame
+            if self._latest_frame_jpeg is not None:
+                await self._write_mjpeg_frame(response, self._latest_frame_jpeg)
+            
+            while self.video_streaming and self.video_streaming_enabled:
+                try:
+                    # Bounded wait so a disconnected viewer is noticed even when no frames arrive
+                    await asyncio.wait_for(self._frame_event.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+                
+                if request.transport is None or request.transport.is_closing():
+                    break
+                
+                frame_bytes = self._latest_frame_jpeg
+                if frame_bytes is None or not (self.video_streaming and self.video_streaming_enabled):
+                    continue
+                
+                await self._write_mjpeg_frame(response, frame_bytes)
+        except ConnectionResetError:
+            pass
+        finally:
+            self._video_viewers.discard(response)
+        
+        return response
+    
+    async def _write_mjpeg_frame(self, response, frame_bytes: bytes):
+        """Write one JPEG part of the multipart MJPEG stream."""
+        await response.write(
+            b'--frame\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n' % len(frame_bytes)
+            + frame_bytes + b'\r\n'
+        )
+    
     async def broadcast_log(self, message: str, level: str = 'info'):
-        """Broadcast log message to all web clients."""
+        """Queue log message for the next batched broadcast to all web clients."""
         if self.sio and self.web_clients:
-            await self.sio.emit('log', {
+            self._pending_logs.append({
                 'message': message,
                 'level': level,
-                'timestamp': time.strftime('%H:%M:%S')
+                'timestamp': _log_timestamp()
             })
+            
+            if self._log_flush_task is None or self._log_flush_task.done():
+                self._log_flush_task = asyncio.create_task(self._flush_logs())
+                self._log_flush_task.add_done_callback(self._on_log_flush_done)
+    
+    def _on_log_flush_done(self, task: asyncio.Task):
+        """Log a failed log_batch broadcast instead of leaving the exception unretrieved."""
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.warning("⚠️ Log broadcast failed: %s", task.exception())
+    
+    async def _flush_logs(self):
+        """Send all log entries queued within the flush interval as one log_batch event."""
+        await asyncio.sleep(self.log_flush_interval)
+        
+        entries, self._pending_logs = self._pending_logs, []
+        if entries and self.sio and self.web_clients:
+            await self.sio.emit('log_batch', entries)
+    
+    def _status_snapshot(self) -> Dict[str, Any]:
+        """Build the full drone status in the camelCase form the WebUI expects."""
+        return {
+            'isFlying': self.drone_state.is_flying,
+            'battery': int(self.drone_state.battery),
+            'height': int(self.drone_state.height),
+            'lastImageAnalysis': self.drone_state.last_image_analysis,
+            'movementCount': self.drone_state.movement_count,
+            'obstaclesDetected': list(self.drone_state.obstacles_detected),
+            'speechEnabled': self.speech_enabled,
+            'videoStreamingEnabled': self.video_streaming_enabled
+        }
     
     async def broadcast_drone_status(self):
-        """Broadcast drone status to all web clients."""
+        """Broadcast changed drone status fields to all web clients."""
         if self.sio and self.web_clients:
-            # Convert snake_case to camelCase for WebUI compatibility
-            status_data = {
-                'isFlying': self.drone_state.is_flying,
-                'battery': self.drone_state.battery,
-                'height': self.drone_state.height,
-                'lastImageAnalysis': self.drone_state.last_image_analysis,
-                'movementCount': self.drone_state.movement_count,
-                'obstaclesDetected': self.drone_state.obstacles_detected,
-                'speechEnabled': self.speech_enabled,
-                'videoStreamingEnabled': self.video_streaming_enabled
-            }
-            await self.sio.emit('drone_status', status_data)
+            status_data = self._status_snapshot()
+            delta = {key: value for key, value in status_data.items() if self._last_status.get(key) != value}
+            
+            # Nothing changed since the last broadcast - skip the send entirely
+            if not delta:
+                return
+            
+            await self.sio.emit('drone_status_delta', delta)
+            # Only remember what was actually sent, so a failed emit is retried on the next broadcast
+            self._last_status = status_data
+    
+    def request_status_broadcast(self):
+        """Schedule a status broadcast, coalescing bursts of requests into a single send."""
+        if self._status_flush_handle is None and self.sio and self.web_clients:
+            self._status_flush_handle = asyncio.get_running_loop().call_later(
+                self.status_coalesce_window, self._flush_status_broadcast
+            )
+    
+    def _flush_status_broadcast(self):
+        """Send the coalesced status broadcast."""
+        self._status_flush_handle = None
+        task = asyncio.get_running_loop().create_task(self.broadcast_drone_status())
+        self._status_broadcast_tasks.add(task)
+        task.add_done_callback(self._on_status_broadcast_done)
+
+    def _on_status_broadcast_done(self, task: asyncio.Task):
+        """Drop the finished broadcast task and log any failure."""
+        self._status_broadcast_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.warning("⚠️ Status broadcast failed: %s", task.exception())
     
     # [Include all the existing methods from the original RealtimeDroneAgent class]
     # For brevity, I'm including the key methods that need modification:
@@ -445,10 +832,15 @@ class WebEnabledDroneAgent:
                 ws_url,
                 additional_headers=headers,
                 ping_interval=20,
-                ping_timeout=10
+                ping_timeout=10,
+                # Audio/image payloads are base64 media; deflate costs CPU and latency for little gain
+                compression=None
             )
             
             self.is_realtime_connected = True
+            # A fresh session has no response in flight
+            self.response_active = False
+            self._continuation_pending = False
             self.logger.info("✅ Connected to GPT-4o Realtime API")
             await self.broadcast_log("Connected to GPT-4o Realtime API", "success")
             
@@ -467,8 +859,9 @@ class WebEnabledDroneAgent:
     
     async def _capture_and_analyze_image(self, focus: str = "objects", **kwargs) -> str:
         """Capture and analyze image from drone camera using the vision analyzer."""
-        self.logger.info(f"📸 Delegating to vision analyzer: {focus}")
-        await self.broadcast_log(f"📸 Analyzing image: {focus}", "info")
+        self.logger.info("📸 Delegating to vision analyzer: %s", focus)
+        if self.web_clients:
+            await self.broadcast_log(f"📸 Analyzing image: {focus}", "info")
         
         try:
             result = await self.vision_analyzer.capture_and_analyze_image(
@@ -479,7 +872,7 @@ class WebEnabledDroneAgent:
             
             # Update drone state with analysis result
             self.drone_state.last_image_analysis = result
-            await self.broadcast_drone_status()
+            self.request_status_broadcast()
             
             return result
             
@@ -494,11 +887,18 @@ class WebEnabledDroneAgent:
     async def start_hybrid_control(self):
         """Start both speech control and web UI control."""
         self.running = True
+        self.loop = asyncio.get_running_loop()
+        
+        # Blocking drone SDK calls are offloaded with asyncio.to_thread, which uses the default executor
+        self.loop.set_default_executor(concurrent.futures.ThreadPoolExecutor(
+            max_workers=int(os.getenv("THREAD_POOL_SIZE", 16)),
+            thread_name_prefix="drone_io"
+        ))
         
         try:
             # Initialize drone if not vision-only
             if not self.vision_only:
-                self._setup_drone()
+                await self._setup_drone()
             
             # Setup web server if enabled
             if self.enable_web_ui:
@@ -544,11 +944,12 @@ class WebEnabledDroneAgent:
             try:
                 # Update drone status
                 if not self.vision_only:
-                    self.drone_state.battery = self.drone.get_battery()
-                    self.drone_state.height = self.drone.get_height()
+                    self.drone_state.battery = await asyncio.to_thread(self.drone.get_battery)
+                    self.drone_state.height = await asyncio.to_thread(self.drone.get_height)
                 
                 # Broadcast to web clients
-                await self.broadcast_drone_status()
+                if self.web_clients:
+                    await self.broadcast_drone_status()
                 
                 await asyncio.sleep(2)  # Update every 2 seconds
                 
@@ -556,28 +957,28 @@ class WebEnabledDroneAgent:
                 self.logger.error(f"❌ Status update error: {e}")
                 await asyncio.sleep(5)
     
-    def _setup_drone(self):
+    async def _setup_drone(self):
         """Initialize drone connection.""" 
         try:
             self.logger.info("Connecting to Tello drone...")
-            if self.drone.connect():
+            if await asyncio.to_thread(self.drone.connect):
                 self.logger.info("✅ Drone connected, starting video stream...")
                 
                 # Start video stream
-                self.drone.streamon()
+                await asyncio.to_thread(self.drone.streamon)
                 
                 # Wait a moment for video stream to initialize
-                time.sleep(2)
+                await asyncio.sleep(2)
                 
                 # Get drone status
-                self.drone_state.battery = self.drone.get_battery()
-                self.drone_state.height = self.drone.get_height()
+                self.drone_state.battery = await asyncio.to_thread(self.drone.get_battery)
+                self.drone_state.height = await asyncio.to_thread(self.drone.get_height)
                 
                 self.logger.info(f"✅ Drone fully initialized - Battery: {self.drone_state.battery}%, Height: {self.drone_state.height}cm")
                 asyncio.create_task(self.broadcast_log(f"Drone connected - Battery: {self.drone_state.battery}%, Height: {self.drone_state.height}cm", "success"))
                 
                 # Test video stream
-                test_frame = self.drone.get_frame()
+                test_frame = await asyncio.to_thread(self.drone.get_frame)
                 if test_frame is not None and test_frame.size > 0:
                     self.logger.info("✅ Video stream confirmed working")
                     asyncio.create_task(self.broadcast_log("Video stream initialized", "success"))
@@ -595,303 +996,7 @@ class WebEnabledDroneAgent:
     async def _configure_realtime_session(self):
         """Configure the realtime session with drone tools."""
         
-        session_config = {
-            "type": "session.update",
-            "session": {
-                "modalities": ["text", "audio"],  # Vision is handled separately
-                "instructions": """You are an intelligent real-time drone controller assistant. You can do simple movements or complex maneuvers by moving in multiple steps
-
-🚁 EXECUTION STYLE:
-- WHen given complex tasks, you break them into smaller tasks and execute continuously. 
-- If asked go in a circle of 100cm, you break circle into smaller waypoints, calculate where to move and execute each step without pausing untill you complete circle
-- Execute multi-step commands smoothly: "move forward 50cm then turn right and go forward 50cm again" should flow naturally without any stop in between
-- Don't ask for confirmation or stop between steps
-- Full 360 rotation is allowed, no need to pause or complete in smaller steps
-- When asked to move while captuing, capture images every 1 sec and check for obstacles before moving next step 
-
-🎙️ COMMUNICATION:
-- Give brief status updates only when asked
-- Dont announce any result of any operations or movements performed unless i ask for status
-- Be conversational but efficient and as short as possible
-
-
-🚁 DRONE CONTROL:
-- Take off and land the drone safely
-- Move the drone in all directions (forward, backward, up, down, left, right, curve ) 
-- Rotate the drone clockwise and counter-clockwise  
-- Get real-time drone status (battery, height, flight state)
-- Capture and analyze live camera images from the drone
-""",
-
-                "voice": "alloy",
-                "input_audio_format": "pcm16",
-                "output_audio_format": "pcm16",
-                "input_audio_transcription": {
-                    "model": "whisper-1"
-                },
-                "turn_detection": {
-                    "type": "server_vad",
-                    "threshold": 0.5,
-                    "prefix_padding_ms": 300,
-                    "silence_duration_ms": 500
-                },
-                "tools": [
-                    {
-                        "type": "function",
-                        "name": "takeoff",
-                        "description": "Take off the drone safely - only use when drone is on ground",
-                        "parameters": {"type": "object", "properties": {}}
-                    },
-                    {
-                        "type": "function",
-                        "name": "land", 
-                        "description": "Land the drone safely at current location",
-                        "parameters": {"type": "object", "properties": {}}
-                    },
-                    {
-                        "type": "function",
-                        "name": "move_forward",
-                        "description": "Move drone forward by specified distance",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "distance": {
-                                    "type": "integer",
-                                    "description": "Distance in centimeters (5-100cm recommended)",
-                                    "minimum": 5,
-                                    "maximum": 300
-                                }
-                            },
-                            "required": ["distance"]
-                        }
-                    },
-                    {
-                        "type": "function",
-                        "name": "move_backward",
-                        "description": "Move drone backward by specified distance", 
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "distance": {
-                                    "type": "integer",
-                                    "description": "Distance in centimeters (5-100cm)",
-                                    "minimum": 5,
-                                    "maximum": 100
-                                }
-                            },
-                            "required": ["distance"]
-                        }
-                    },
-                    {
-                        "type": "function",
-                        "name": "move_left",
-                        "description": "Move drone left by specified distance",
-                        "parameters": {
-                            "type": "object", 
-                            "properties": {
-                                "distance": {
-                                    "type": "integer",
-                                    "description": "Distance in centimeters (5-100cm)",
-                                    "minimum": 5,
-                                    "maximum": 100
-                                }
-                            },
-                            "required": ["distance"]
-                        }
-                    },
-                    {
-                        "type": "function",
-                        "name": "move_right",
-                        "description": "Move drone right by specified distance",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "distance": {
-                                    "type": "integer", 
-                                    "description": "Distance in centimeters (5-100cm)",
-                                    "minimum": 5,
-                                    "maximum": 100
-                                }
-                            },
-                            "required": ["distance"]
-                        }
-                    },
-                    {
-                        "type": "function",
-                        "name": "move_up",
-                        "description": "Move drone up by specified distance",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "distance": {
-                                    "type": "integer",
-                                    "description": "Distance in centimeters (20-80cm recommended)",
-                                    "minimum": 20,
-                                    "maximum": 100
-                                }
-                            },
-                            "required": ["distance"]
-                        }
-                    },
-                    {
-                        "type": "function",
-                        "name": "move_down", 
-                        "description": "Move drone down by specified distance",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "distance": {
-                                    "type": "integer",
-                                    "description": "Distance in centimeters (20-80cm recommended)",
-                                    "minimum": 20,
-                                    "maximum": 100
-                                }
-                            },
-                            "required": ["distance"]
-                        }
-                    },
-                    {
-                        "type": "function",
-                        "name": "rotate_clockwise",
-                        "description": "Rotate drone clockwise by specified angle",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "angle": {
-                                    "type": "integer",
-                                    "description": "Rotation angle in degrees (30-180°)",
-                                    "minimum": 30,
-                                    "maximum": 180
-                                }
-                            },
-                            "required": ["angle"]
-                        }
-                    },
-                    {
-                        "type": "function",
-                        "name": "rotate_counter_clockwise",
-                        "description": "Rotate drone counter-clockwise by specified angle", 
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "angle": {
-                                    "type": "integer",
-                                    "description": "Rotation angle in degrees (30-180°)",
-                                    "minimum": 30,
-                                    "maximum": 180
-                                }
-                            },
-                            "required": ["angle"]
-                        }
-                    },
-                    {
-                        "type": "function",
-                        "name": "get_drone_status",
-                        "description": "Get current drone status including battery, height, and flight state",
-                        "parameters": {"type": "object", "properties": {}}
-                    },
-                    {
-                        "type": "function",
-                        "name": "capture_and_analyze_image",
-                        "description": "Capture current camera view and provide description of what the drone sees",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "focus": {
-                                    "type": "string",
-                                    "description": "What to focus on: obstacles, objects, navigation, landing_spot",
-                                    "enum": ["obstacles", "objects", "navigation", "landing_spot"]
-                                }
-                            },
-                            "required": ["focus"]
-                        }
-                    },
-                    {
-                        "type": "function",
-                        "name": "curve_xyz_speed",
-                        "description": "Fly in a curve from current position to specified coordinates with speed control. Tello requires: (1) each waypoint must be at least ~20 cm away from the current position, (2) the curve radius must be between 50 cm and 1000 cm, and (3) the flight speed must be between 10–60 cm/s. The schema enforces per-field ranges, but your runtime code should also validate the waypoint distance and curve radius before sending the command.",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                            "x1": {
-                                "type": "integer",
-                                "description": "First waypoint X coordinate in cm (recommended range: -30 to 30). Must be ≥20 cm from origin together with y1/z1."
-                            },
-                            "y1": {
-                                "type": "integer",
-                                "description": "First waypoint Y coordinate in cm (recommended range: -30 to 30). Must be ≥20 cm from origin together with x1/z1."
-                            },
-                            "z1": {
-                                "type": "integer",
-                                "description": "First waypoint Z coordinate in cm (recommended range: -30 to 30). Must be ≥20 cm from origin together with x1/y1."
-                            },
-                            "x2": {
-                                "type": "integer",
-                                "description": "Second waypoint X coordinate in cm (recommended range: -30 to 30). Must be ≥20 cm from origin together with y2/z2."
-                            },
-                            "y2": {
-                                "type": "integer",
-                                "description": "Second waypoint Y coordinate in cm (recommended range: -30 to 30). Must be ≥20 cm from origin together with x2/z2."
-                            },
-                            "z2": {
-                                "type": "integer",
-                                "description": "Second waypoint Z coordinate in cm (recommended range: -30 to 30). Must be ≥20 cm from origin together with x2/y2."
-                            },
-                            "speed": {
-                                "type": "integer",
-                                "description": "Flight speed in cm/s (allowed range: 10–60)."
-                            }
-                            },
-                            "required": ["x1", "y1", "z1", "x2", "y2", "z2", "speed"],
-                            "examples": [
-                                { "x1": 20, "y1": 0, "z1": 0, "x2": 20, "y2": 30, "z2": 0, "speed": 30 },
-                                { "x1": 15, "y1": -20, "z1": 0, "x2": -15, "y2": 25, "z2": 0, "speed": 25 }
-                            ]
-                        }
-                    },
-                    {
-                        "type": "function",
-                        "name": "go_xyz_speed",
-                        "description": "Fly directly to specified coordinates relative to current position with speed control",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "x": {
-                                    "type": "integer",
-                                    "description": "X coordinate in cm (-30 to 30, positive=right)",
-                                    "minimum": -30,
-                                    "maximum": 30
-                                },
-                                "y": {
-                                    "type": "integer",
-                                    "description": "Y coordinate in cm (-30 to 30, positive=forward)",
-                                    "minimum": -30,
-                                    "maximum": 30
-                                },
-                                "z": {
-                                    "type": "integer",
-                                    "description": "Z coordinate in cm (-30 to 30, positive=up)",
-                                    "minimum": -30,
-                                    "maximum": 30
-                                },
-                                "speed": {
-                                    "type": "integer",
-                                    "description": "Flight speed in cm/s (10-100)",
-                                    "minimum": 10,
-                                    "maximum": 100
-                                }
-                            },
-                            "required": ["x", "y", "z", "speed"]
-                        }
-                    }
-                ],
-                "tool_choice": "auto",
-                "temperature": 0.7,
-                "max_response_output_tokens": 4096
-            }
-        }
-        
-        await self.realtime_websocket.send(json.dumps(session_config))
+        await self.realtime_websocket.send(SESSION_UPDATE_MESSAGE)
         self.logger.info("🔧 Realtime session configured with drone tools")
     
     def start_audio_streams(self):
@@ -921,31 +1026,42 @@ class WebEnabledDroneAgent:
             self.logger.info("🎤🔊 Audio streams started")
             
             # Start audio worker threads
-            threading.Thread(target=self._audio_input_worker, daemon=True).start()
+            self._start_audio_input_thread()
             threading.Thread(target=self._audio_output_worker, daemon=True).start()
             
         except Exception as e:
             self.logger.error(f"❌ Failed to start audio streams: {e}")
     
+    def _start_audio_input_thread(self):
+        """Start the microphone worker thread and keep a handle to it."""
+        self.audio_input_thread = threading.Thread(target=self._audio_input_worker, daemon=True)
+        self.audio_input_thread.start()
+    
     def _audio_input_worker(self):
         """Worker thread for audio input."""
         while self.recording and self.running:
             try:
                 if self.input_stream:
                     data = self.input_stream.read(self.CHUNK, exception_on_overflow=False)
-                    self.input_audio_queue.put(data)
+                    self.loop.call_soon_threadsafe(self._enqueue_input_audio, data)
             except Exception as e:
                 self.logger.error(f"❌ Audio input error: {e}")
                 time.sleep(0.1)
     
+    def _enqueue_input_audio(self, data: bytes):
+        """Queue a microphone chunk on the event loop, dropping the oldest if the sender fell behind."""
+        if self.input_audio_queue.full():
+            self.input_audio_queue.get_nowait()
+        self.input_audio_queue.put_nowait(data)
+    
     def _audio_output_worker(self):
         """Worker thread for audio output."""
         while self.playing and self.running:
             try:
-                if not self.output_audio_queue.empty():
-                    audio_data = self.output_audio_queue.get(timeout=0.1)
-                    if self.output_stream:
-                        self.output_stream.write(audio_data)
+                # Block until audio arrives instead of spinning on empty()
+                audio_data = self.output_audio_queue.get(timeout=0.1)
+                if self.output_stream:
+                    self.output_stream.write(audio_data)
             except queue.Empty:
                 continue
             except Exception as e:
@@ -956,31 +1072,20 @@ class WebEnabledDroneAgent:
         """Send microphone audio to the realtime API."""
         while self.is_realtime_connected and self.running:
             try:
-                # Only process audio if speech is enabled
-                if self.speech_enabled and not self.input_audio_queue.empty():
-                    audio_data = self.input_audio_queue.get(timeout=0.1)
-                    
-                    # Encode audio data as base64
-                    audio_base64 = base64.b64encode(audio_data).decode('utf-8')
-                    
-                    # Send audio to realtime API
-                    message = {
-                        "type": "input_audio_buffer.append",
-                        "audio": audio_base64
-                    }
-                    
-                    await self.realtime_websocket.send(json.dumps(message))
-                elif not self.speech_enabled:
-                    # Clear the audio queue when speech is disabled to prevent buffer buildup
-                    while not self.input_audio_queue.empty():
-                        try:
-                            self.input_audio_queue.get_nowait()
-                        except queue.Empty:
-                            break
+                # Wake only when the microphone thread hands over a chunk
+                audio_data = await asyncio.wait_for(self.input_audio_queue.get(), timeout=0.5)
                 
-                await asyncio.sleep(0.01)  # Small delay to prevent overwhelming
+                # Drop audio captured while speech control is disabled
+                if not self.speech_enabled:
+                    continue
                 
-            except queue.Empty:
+                # Encode audio data as base64
+                audio_base64 = base64.b64encode(audio_data).decode('utf-8')
+                
+                # Send audio to realtime API
+                await self.realtime_websocket.send(AUDIO_APPEND_PREFIX + audio_base64 + AUDIO_APPEND_SUFFIX)
+                
+            except asyncio.TimeoutError:
                 continue
             except Exception as e:
                 self.logger.error(f"❌ Audio send error: {e}")
@@ -990,7 +1095,7 @@ class WebEnabledDroneAgent:
         """Handle messages from the realtime API."""
         try:
             async for message in self.realtime_websocket:
-                data = json.loads(message)
+                data = json_loads(message)
                 await self._process_message(data)
                 
         except websockets.exceptions.ConnectionClosed:
@@ -1015,20 +1120,32 @@ class WebEnabledDroneAgent:
             
         elif msg_type == "conversation.item.input_audio_transcription.completed":
             transcript = data.get("transcript", "")
-            self.logger.info(f"📝 You said: {transcript}")
-            await self.broadcast_log(f"🗣️ You said: {transcript}", "info")
+            self.logger.info("📝 You said: %s", transcript)
+            if self.web_clients:
+                await self.broadcast_log(f"🗣️ You said: {transcript}", "info")
+            
+        elif msg_type == "response.created":
+            # Response generation started
+            self.response_active = True
+            
+        elif msg_type == "response.done":
+            # Response generation finished - a deferred continuation can be requested now
+            self.response_active = False
+            if self._continuation_pending:
+                self._continuation_pending = False
+                await self.realtime_websocket.send(RESPONSE_CREATE_MESSAGE)
             
         elif msg_type == "response.audio.delta":
             # Stream audio response to speakers
             if "delta" in data:
                 audio_data = base64.b64decode(data["delta"])
-                self.output_audio_queue.put(audio_data)
+                self.output_audio_queue.put_nowait(audio_data)
                 
         elif msg_type == "response.function_call_arguments.delta":
             # Function call in progress
             function_name = data.get("name", "")
             if function_name:
-                self.logger.info(f"🔧 Calling function: {function_name}")
+                self.logger.info("🔧 Calling function: %s", function_name)
                 
         elif msg_type == "response.function_call_arguments.done":
             # Execute function call
@@ -1037,7 +1154,7 @@ class WebEnabledDroneAgent:
             arguments_str = data.get("arguments", "{}")
             
             try:
-                arguments = json.loads(arguments_str)
+                arguments = json_loads(arguments_str)
                 result = await self._execute_function(function_name, arguments)
                 
                 # Send result back to API
@@ -1050,23 +1167,21 @@ class WebEnabledDroneAgent:
                     }
                 }
                 
-                await self.realtime_websocket.send(json.dumps(response))
+                await self.realtime_websocket.send(json_dumps(response))
                 
                 # Check if this is a vision analysis that's already handling its own response
                 if result.startswith("[PROCESSING]"):
-                    self.logger.info(f"🔄 {function_name} handling its own response - skipping duplicate trigger")
+                    self.logger.info("🔄 %s handling its own response - skipping duplicate trigger", function_name)
                 else:
                     # Automatically trigger next step for multi-step commands
-                    self.logger.info(f"🎙️ Triggering continuation for: {function_name}")
-                    
-                    # Small delay to ensure function result is processed
-                    await asyncio.sleep(0.1)
+                    self.logger.info("🎙️ Triggering continuation for: %s", function_name)
                     
-                    # Trigger response generation to continue with next steps
-                    response_request = {
-                        "type": "response.create"
-                    }
-                    await self.realtime_websocket.send(json.dumps(response_request))
+                    # Trigger response generation to continue with next steps - deferred until
+                    # response.done if the function-call response is still active
+                    if self.response_active:
+                        self._continuation_pending = True
+                    else:
+                        await self.realtime_websocket.send(RESPONSE_CREATE_MESSAGE)
                 
             except Exception as e:
                 self.logger.error(f"❌ Function execution error: {e}")
@@ -1079,11 +1194,17 @@ class WebEnabledDroneAgent:
     async def _execute_function(self, function_name: str, arguments: dict) -> str:
         """Execute a drone function and return result."""
         try:
-            if function_name in self.functions:
-                func = self.functions[function_name]
+            func = self.functions.get(function_name)
+            if func is not None:
                 result = await func(**arguments)
-                self.logger.info(f"✅ {function_name}: {result}")
-                await self.broadcast_log(f"✅ {function_name}: {result}", "success")
+                self.logger.info("✅ %s: %s", function_name, result)
+                
+                # Headless runs (no browser attached) skip all web UI work
+                if self.web_clients:
+                    await self.broadcast_log(f"✅ {function_name}: {result}", "success")
+                    
+                    # Multi-step voice commands fire many functions back to back; push state once per burst
+                    self.request_status_broadcast()
                 return result
             else:
                 error_msg = f"Unknown function: {function_name}"
@@ -1131,11 +1252,11 @@ class WebEnabledDroneAgent:
             try:
                 if self.drone_state.is_flying:
                     self.logger.info("Landing drone before cleanup...")
-                    self.drone.land()
-                    time.sleep(2)
-                
-                self.drone.streamoff()
-                self.drone.end()
+                    await asyncio.to_thread(self.drone.land)
+                    await asyncio.sleep(2)
+
+                await asyncio.to_thread(self.drone.streamoff)
+                await asyncio.to_thread(self.drone.end)
             except Exception as e:
                 self.logger.warning(f"Drone cleanup warning: {e}")
         
@@ -1176,9 +1297,11 @@ async def main():
     enable_web_ui = not args.no_web_ui
     web_only = args.web_only
     
-    print(f"🤖 Drone Mode: {'VISION ONLY (Simulation)' if vision_only else 'REAL DRONE'}")
-    print(f"🌐 Web UI: {'ENABLED' if enable_web_ui else 'DISABLED'}")
-    print(f"🎙️ Speech Control: {'DISABLED' if web_only else 'ENABLED'}")
+    print("\n".join([
+        f"🤖 Drone Mode: {'VISION ONLY (Simulation)' if vision_only else 'REAL DRONE'}",
+        f"🌐 Web UI: {'ENABLED' if enable_web_ui else 'DISABLED'}",
+        f"🎙️ Speech Control: {'DISABLED' if web_only else 'ENABLED'}",
+    ]))
     
     # Check environment variables for speech control
     if not web_only:
@@ -1217,28 +1340,30 @@ async def main():
         logger.error(f"❌ Main error: {e}")
 
 if __name__ == "__main__":
-    print("🚁🎙️🌐 Web-enabled GPT-4o Realtime Drone Agent")
-    print("=" * 60)
-    print()
-    print("📋 SETUP INSTRUCTIONS:")
-    print("1. Install dependencies:")
-    print("   pip install websockets pyaudio opencv-python numpy python-socketio aiohttp aiohttp-cors")
-    print("2. Set environment variables (for speech control):")
-    print("   export AZURE_OPENAI_ENDPOINT='https://your-resource.openai.azure.com'")
-    print("   export AZURE_OPENAI_API_KEY='your-api-key'")
-    print("   export AZURE_OPENAI_REALTIME_DEPLOYMENT='gpt-4o-realtime-preview'")
-    print("3. Start web UI (in another terminal):")
-    print("   cd webui && npm install && npm start")
-    print()
-    print("🚀 USAGE:")
-    print("   • Full Hybrid Mode:     python web_drone_agent.py")
-    print("   • Web UI Only:          python web_drone_agent.py --web-only")
-    print("   • Real Drone Mode:      python web_drone_agent.py --real-drone")
-    print("   • No Web UI:            python web_drone_agent.py --no-web-ui")
-    print()
+    print("\n".join([
+        "🚁🎙️🌐 Web-enabled GPT-4o Realtime Drone Agent",
+        "=" * 60,
+        "",
+        "📋 SETUP INSTRUCTIONS:",
+        "1. Install dependencies:",
+        "   pip install websockets pyaudio opencv-python numpy python-socketio aiohttp aiohttp-cors",
+        "2. Set environment variables (for speech control):",
+        "   export AZURE_OPENAI_ENDPOINT='https://your-resource.openai.azure.com'",
+        "   export AZURE_OPENAI_API_KEY='your-api-key'",
+        "   export AZURE_OPENAI_REALTIME_DEPLOYMENT='gpt-4o-realtime-preview'",
+        "3. Start web UI (in another terminal):",
+        "   cd webui && npm install && npm start",
+        "",
+        "🚀 USAGE:",
+        "   • Full Hybrid Mode:     python web_drone_agent.py",
+        "   • Web UI Only:          python web_drone_agent.py --web-only",
+        "   • Real Drone Mode:      python web_drone_agent.py --real-drone",
+        "   • No Web UI:            python web_drone_agent.py --no-web-ui",
+        "",
+    ]))
     
     try:
-        asyncio.run(main())
+        run_async(main())
     except KeyboardInterrupt:
         print("\n👋 Goodbye!")
     except Exception as e:
@@ -15,6 +15,18 @@ import {
 } from 'lucide-react';
 import io from 'socket.io-client';
 
+const AGENT_URL = 'http://localhost:8080';
+const VIDEO_STREAM_URL = `${AGENT_URL}/video.mjpg`;
+// Only the most recent entries are kept so long sessions don't re-render an ever-growing list
+const MAX_LOG_ENTRIES = 100;
+
+// Quick control buttons; `blockedWhen` receives whether the drone is flying
+const QUICK_CONTROLS = [
+  { label: 'Take Off', command: 'takeoff', Icon: Plane, color: 'bg-green-600 hover:bg-green-700', blockedWhen: (isFlying) => isFlying },
+  { label: 'Land', command: 'land', Icon: Square, color: 'bg-red-600 hover:bg-red-700', blockedWhen: (isFlying) => !isFlying },
+  { label: 'Analyze', command: 'capture_and_analyze_image', params: { focus: 'objects' }, Icon: Camera, color: 'bg-blue-600 hover:bg-blue-700', blockedWhen: () => false }
+];
+
 // Custom Drone Icon Component
 const DroneIcon = ({ className }) => (
   <svg 
@@ -97,7 +109,6 @@ function App() {
   const [speechEnabled, setSpeechEnabled] = useState(true);
   const [videoStreamingEnabled, setVideoStreamingEnabled] = useState(false);
   const [isExecutingCommand, setIsExecutingCommand] = useState(false);
-  const [videoFrame, setVideoFrame] = useState(null);
   
   const [droneStatus, setDroneStatus] = useState({
     isFlying: false,
@@ -116,7 +127,7 @@ function App() {
   const logsRef = useRef(null);
 
   useEffect(() => {
-    const newSocket = io('http://localhost:8080');
+    const newSocket = io(AGENT_URL);
     
     newSocket.on('connect', () => {
       console.log('Connected to drone agent');
@@ -140,34 +151,37 @@ function App() {
       }
     });
     
+    newSocket.on('drone_status_delta', (delta) => {
+      setDroneStatus(prev => ({ ...prev, ...delta }));
+      if (delta.speechEnabled !== undefined) {
+        setSpeechEnabled(delta.speechEnabled);
+      }
+      if (delta.videoStreamingEnabled !== undefined) {
+        setVideoStreamingEnabled(delta.videoStreamingEnabled);
+      }
+    });
+    
     newSocket.on('log', (logData) => {
       addLog(logData.message, logData.level);
     });
     
+    newSocket.on('log_batch', (entries) => {
+      const timestamp = new Date().toLocaleTimeString();
+      setLogs(prev => [
+        ...prev,
+        ...entries.map(({ message, level }) => ({ message, level, timestamp }))
+      ].slice(-MAX_LOG_ENTRIES));
+    });
+    
     newSocket.on('command_complete', (data) => {
       setIsExecutingCommand(false);
       addLog(`Command ${data.command} completed`, 'success');
     });
-
-    newSocket.on('video_frame', (frameData) => {
-      // Revoke previous URL to prevent memory leaks
-      if (videoFrame) {
-        URL.revokeObjectURL(videoFrame);
-      }
-      
-      const blob = new Blob([frameData], { type: 'image/jpeg' });
-      const url = URL.createObjectURL(blob);
-      setVideoFrame(url);
-    });
     
     setSocket(newSocket);
     
     return () => {
       newSocket.close();
-      // Clean up video frame URL on unmount
-      if (videoFrame) {
-        URL.revokeObjectURL(videoFrame);
-      }
     };
   }, []);
 
@@ -179,7 +193,7 @@ function App() {
 
   const addLog = (message, level = 'info') => {
     const timestamp = new Date().toLocaleTimeString();
-    setLogs(prev => [...prev, { message, level, timestamp }]);
+    setLogs(prev => [...prev, { message, level, timestamp }].slice(-MAX_LOG_ENTRIES));
   };
 
   const executeCommand = async (command, params = {}) => {
@@ -248,9 +262,9 @@ function App() {
                 <h2 className="text-xl font-semibold text-white">Live Video Stream</h2>
               </div>
               <div className="relative bg-black rounded-lg overflow-hidden" style={{ aspectRatio: '4/3' }}>
-                {videoStreamingEnabled && videoFrame ? (
+                {videoStreamingEnabled && connected ? (
                   <img 
-                    src={videoFrame} 
+                    src={VIDEO_STREAM_URL} 
                     alt="Drone video stream" 
                     className="w-full h-full object-cover"
                   />
@@ -352,42 +366,24 @@ function App() {
             <div className="space-y-3">
               {/* Flight Controls and Analysis in one row */}
               <div className="flex space-x-2">
-                <button
-                  onClick={() => executeCommand('takeoff')}
-                  disabled={droneStatus.isFlying || isExecutingCommand}
-                  className={`flex-1 flex items-center justify-center space-x-1 px-3 py-2 rounded-lg text-sm font-medium transition-colors ${
-                    droneStatus.isFlying || isExecutingCommand
-                      ? 'bg-gray-600 text-gray-400 cursor-not-allowed'
-                      : 'bg-green-600 hover:bg-green-700 text-white'
-                  }`}
-                >
-                  <Plane className="w-3 h-3" />
-                  <span>Take Off</span>
-                </button>
-                <button
-                  onClick={() => executeCommand('land')}
-                  disabled={!droneStatus.isFlying || isExecutingCommand}
-                  className={`flex-1 flex items-center justify-center space-x-1 px-3 py-2 rounded-lg text-sm font-medium transition-colors ${
-                    !droneStatus.isFlying || isExecutingCommand
-                      ? 'bg-gray-600 text-gray-400 cursor-not-allowed'
-                      : 'bg-red-600 hover:bg-red-700 text-white'
-                  }`}
-                >
-                  <Square className="w-3 h-3" />
-                  <span>Land</span>
-                </button>
-                <button
-                  onClick={() => executeCommand('capture_and_analyze_image', { focus: 'objects' })}
-                  disabled={isExecutingCommand}
-                  className={`flex-1 flex items-center justify-center space-x-1 px-3 py-2 rounded-lg text-sm font-medium transition-colors ${
-                    isExecutingCommand
-                      ? 'bg-gray-600 text-gray-400 cursor-not-allowed'
-                      : 'bg-blue-600 hover:bg-blue-700 text-white'
-                  }`}
-                >
-                  <Camera className="w-3 h-3" />
-                  <span>Analyze</span>
-                </button>
+                {QUICK_CONTROLS.map(({ label, command, params, Icon, color, blockedWhen }) => {
+                  const disabled = isExecutingCommand || blockedWhen(droneStatus.isFlying);
+                  return (
+                    <button
+                      key={command}
+                      onClick={() => executeCommand(command, params)}
+                      disabled={disabled}
+                      className={`flex-1 flex items-center justify-center space-x-1 px-3 py-2 rounded-lg text-sm font-medium transition-colors ${
+                        disabled
+                          ? 'bg-gray-600 text-gray-400 cursor-not-allowed'
+                          : `${color} text-white`
+                      }`}
+                    >
+                      <Icon className="w-3 h-3" />
+                      <span>{label}</span>
+                    </button>
+                  );
+                })}
               </div>
 
               {/* Control Toggles */}